@@ -1,95 +1,213 @@
-import pandas as pd
-import sqlite3
-from rapidfuzz import fuzz
+import argparse
+import contextlib
+import json
 import os
-from loginbot import get_login, list_clouds_starting
-
-excel_file = "./MASTER DVD.xlsx"
-db_file = "mark_database.db"
-
-def refresh_sql_from_excel():
-    print("🧠 Booting MARK’s brain from Excel...")
-    df = pd.read_excel(excel_file)
-    conn = sqlite3.connect(db_file)
-    df.to_sql("mark_table", conn, if_exists="replace", index=False)
-    conn.commit()
-    conn.close()
-    print("✅ Database loaded. MARK’s memory is sharp.")
-
-def search_sql_data(query):
-    conn = sqlite3.connect(db_file)
-    df = pd.read_sql_query("SELECT * FROM mark_table", conn)
-    conn.close()
-    results = []
-    for _, row in df.iterrows():
-        text = " ".join(map(str, row.fillna("")))
-        score = fuzz.partial_ratio(query.lower(), text.lower())
-        if score >= 75:
-            results.append((score, row))
-    results.sort(reverse=True, key=lambda x: x[0])
-    return results[:10]
-
-def search_autograph_data(query):
-    try:
-        df = pd.read_excel(excel_file, sheet_name="Autographs")
-    except Exception:
-        print("🛑 Couldn't load 'Autographs'. Maybe they're dodging fans.")
-        return []
-
-    results = []
-    for _, row in df.iterrows():
-        row_text = " ".join(map(str, row.fillna("")))
-        score = fuzz.partial_ratio(query.lower(), row_text.lower())
-        if score >= 75:
-            results.append((score, row))
-    results.sort(reverse=True, key=lambda x: x[0])
-    return results[:10]
-
-def get_disc(disc_id):
-    conn = sqlite3.connect(db_file)
-    try:
-        df = pd.read_sql_query("SELECT * FROM mark_table WHERE [Disc #] = ?", conn, params=[disc_id])
-    except Exception:
-        df = pd.DataFrame()
-    conn.close()
-    return df
-
-def count_discs(keyword):
-    conn = sqlite3.connect(db_file)
-    df = pd.read_sql_query("SELECT * FROM mark_table", conn)
-    conn.close()
-    keyword = keyword.lower()
-    count = sum(df[col].astype(str).str.lower().str.contains(keyword).sum() for col in df.columns)
-    return count
-
-def first_disc(name_query):
-    matches = search_sql_data(name_query)
-    return matches[0][1] if matches else None
-
-def filter_by_company(company):
-    conn = sqlite3.connect(db_file)
-    df = pd.read_sql_query("SELECT * FROM mark_table WHERE Company = ?", conn, params=[company])
-    conn.close()
-    return df
-
-def filter_by_date(event_date):
-    conn = sqlite3.connect(db_file)
-    df = pd.read_sql_query("SELECT * FROM mark_table WHERE Date = ?", conn, params=[event_date])
-    conn.close()
-    return df
-
-def roast_unknown_command():
-    burns = [
-        "If that was a command, it’s in a dialect even I don’t speak.",
-        "I’d respond... if I knew what that was.",
-        "404: Brain not found. Try `search:` or something I actually support."
-    ]
-    print(f"🤷‍♂️ {burns[0]}")
-
-def main():
-    if not os.path.exists(db_file):
+import sys
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, "pages"))
+from loginbot import LoginBot
+from mark_lookup import disc_rows, catalog_ready, DB_FILE
+from catalog_schema import SchemaError
+from mark_query import QueryError
+
+LOGS_FILE = os.path.join(ROOT, "LOGS.txt")
+
+# Command prefixes, longest first so `first disc:` wins over `disc:`
+COMMANDS = ["first disc:", "login for:", "autograph:", "company:", "search:", "prefix:",
+            "count:", "stats:", "date:", "disc:", "find ", "refresh"]
+
+def core():
+    """Import mark_core, and with it pandas, only for commands that need it"""
+    import mark_core
+    return mark_core
+
+def load_loginbot(path=LOGS_FILE):
+    loginbot = LoginBot()
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            loginbot.load_credentials_from_file(f.read())
+    return loginbot
+
+def normalize_command(text):
+    """Accept shell-style `search matrix` as well as `search:matrix`"""
+    text = text.strip()
+    for prefix in COMMANDS:
+        if text.startswith(prefix):
+            return text
+    for prefix in COMMANDS:
+        name = prefix.rstrip(": ")
+        if text.lower() == name or text.lower().startswith(name + " "):
+            return (prefix + text[len(name):].strip()) if prefix != "refresh" else prefix
+    return text
+
+def _result(command, status, message="", rows=None):
+    return {"command": command, "status": status, "message": message, "rows": rows or []}
+
+def _plain(row):
+    """Row dictionary with missing values as None so it serializes as JSON"""
+    return {key: None if isinstance(value, float) and value != value else value for key, value in row.items()}
+
+def _records(df):
+    return [_plain(row) for row in df.to_dict("records")]
+
+def run_command(command, loginbot):
+    """
+    Run one MARK command and return its outcome as plain data
+
+    Returns:
+        Dictionary with the command, a status of ok, empty or error,
+        a message and result rows as dictionaries
+    """
+    if command.startswith("disc:"):
+        disc_id = command[5:].strip()
+        if not catalog_ready():
+            core().ensure_db_ready()
+        rows = disc_rows(disc_id)
+        if rows:
+            return _result(command, "ok", f"📊 Query returned {len(rows)} rows", rows)
+        return _result(command, "empty", f"🛑 No disc found for '{disc_id}'. Maybe it's imaginary.")
+
+    if command.startswith("login for:"):
+        alias = command[10:].strip()
+        creds = loginbot.get_login(alias)
+        if creds:
+            return _result(command, "ok", f"🔐 Credentials incoming:\n{creds}")
+        return _result(command, "empty", "🛑 Login not found. Try remembering where you wrote it down.")
+
+    if command.startswith("prefix:"):
+        clouds = loginbot.list_clouds_starting(command[7:].strip())
+        if clouds:
+            return _result(command, "ok", "📡 Aliases matching your vibe:", [{"Alias": c} for c in clouds])
+        return _result(command, "empty", "📡 No aliases found. Try a broader prefix before you start crying.")
+
+    mark = core()
+
+    if command.startswith("search:"):
+        results = mark.search_sql_data(command[7:].strip())
+        if results:
+            return _result(command, "ok", f"🔍 {len(results)} matches:",
+                           [{"Score": score, **_plain(row.to_dict())} for score, row in results])
+        return _result(command, "empty", "🫠 Zero matches. Maybe spellcheck is your friend.")
+
+    if command.startswith("autograph:"):
+        results = mark.search_autograph_data(command[10:].strip())
+        if results:
+            return _result(command, "ok", f"✍️ {len(results)} autograph matches:",
+                           [{"Score": score, **_plain(row.to_dict())} for score, row in results])
+        return _result(command, "empty", "🫠 No autographs found. Maybe they bailed on the signing table.")
+
+    if command.startswith("count:"):
+        keyword = command[6:].strip()
+        total = mark.count_discs(keyword)
+        return _result(command, "ok", f"📦 '{keyword}' appears {total} times. That’s probably more than your monthly cardio.",
+                       [{"Keyword": keyword, "Count": total}])
+
+    if command.startswith("first disc:"):
+        result = mark.first_disc(command[11:].strip())
+        if result is not None:
+            return _result(command, "ok", "🎯 First match:", [_plain(result.to_dict())])
+        return _result(command, "empty", "🛑 Nothing. Move along, Sherlock.")
+
+    if command.startswith("find "):
+        try:
+            df = mark.find_discs(command[5:])
+        except QueryError as e:
+            return _result(command, "error", f"🛑 {e}")
+        if df.empty:
+            return _result(command, "empty", "🫠 Nothing matched all of that. Try loosening a filter.")
+        return _result(command, "ok", f"🔎 {len(df)} rows:", _records(df))
+
+    if command.startswith("company:"):
+        company = command[8:].strip()
+        df = mark.filter_by_company(company)
+        if df.empty:
+            return _result(command, "empty", f"🛑 No events found for '{company}'. Even they forgot to show up.")
+        return _result(command, "ok", f"🏢 {len(df)} events:", _records(df))
+
+    if command.startswith("date:"):
+        event_date = command[5:].strip()
+        try:
+            df = mark.filter_by_date(event_date)
+        except QueryError as e:
+            return _result(command, "error", f"🛑 {e}")
+        if df.empty:
+            return _result(command, "empty", f"🛑 No events for '{event_date}'. Maybe it's a holiday.")
+        return _result(command, "ok", f"📅 {len(df)} events:", _records(df))
+
+    if command.startswith("stats:"):
+        try:
+            df = mark.catalog_stats(command[6:] or "company")
+        except QueryError as e:
+            return _result(command, "error", f"🛑 {e}")
+        return _result(command, "ok", f"📈 {len(df)} groups:", _records(df))
+
+    if command.lower() == "refresh":
+        try:
+            mark.refresh_sql_from_excel()
+        except SchemaError as e:
+            return _result(command, "error", f"🛑 Workbook rejected, keeping the current database: {e}")
+        return _result(command, "ok", "📂 Database reloaded from Excel.")
+
+    return _result(command, "error", mark.roast_unknown_command())
+
+def format_rows(rows):
+    """Plain-text table for result rows, without pandas"""
+    if not rows:
+        return ""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    cells = [[str(row.get(col, "")) for col in columns] for row in rows]
+    widths = [max(len(col), *(len(line[i]) for line in cells)) for i, col in enumerate(columns)]
+    lines = ["  ".join(col.rjust(width) for col, width in zip(columns, widths))]
+    lines += ["  ".join(value.rjust(width) for value, width in zip(line, widths)) for line in cells]
+    return "\n".join(lines)
+
+def print_result(result, as_json=False):
+    if as_json:
+        print(json.dumps(result, default=str, ensure_ascii=False), flush=True)
+        return
+    print(result["message"])
+    if result["rows"]:
+        print(format_rows(result["rows"]))
+
+def run_batch(commands, loginbot, as_json=False):
+    """Run commands one after another; returns 1 if any of them failed"""
+    exit_code = 0
+    for command in commands:
+        command = normalize_command(command)
+        # Keep progress chatter from refreshes out of JSON output
+        with contextlib.redirect_stdout(sys.stderr) if as_json else contextlib.nullcontext():
+            try:
+                result = run_command(command, loginbot)
+            except Exception as e:
+                # One broken command (e.g. no workbook yet) must not end the batch
+                result = _result(command, "error", f"🛑 {type(e).__name__}: {e}")
+        print_result(result, as_json)
+        if result["status"] == "error":
+            exit_code = 1
+    return exit_code
+
+def read_batch(path):
+    """Commands from a file (or stdin for `-`), skipping blank lines and # comments"""
+    f = sys.stdin if path == "-" else open(path, "r")
+    with f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+def print_paged_results(page_fn, value, empty_message):
+    """Print a filter page by page, asking before fetching the next one"""
+    mark = core()
+    shown = 0
+    for df in mark.iter_pages(page_fn, value):
+        print(df.to_string(index=False, header=shown == 0))
+        shown += len(df)
+        if len(df) == mark.PAGE_SIZE and input(f"📄 {shown} rows shown. Enter for more, q to stop: ").strip().lower() == "q":
+            return
+    if shown == 0:
+        print(empty_message)
+
+def interactive(loginbot):
+    if not os.path.exists(DB_FILE):
         print("⚙️ MARK needs his brain installed...")
-        refresh_sql_from_excel()
+        core().refresh_sql_from_excel()
 
     while True:
         user_input = input("\n📣 Command: ").strip()
@@ -97,66 +215,39 @@ def main():
             print("👋 MARK shutting down. Come back when you’ve got real questions.")
             break
 
-        elif user_input.startswith("search:"):
-            query = user_input[7:].strip()
-            results = search_sql_data(query)
-            if results:
-                for score, row in results:
-                    print(f"\n🔍 Match ({score}%):\n{row.to_dict()}")
-            else:
-                print("🫠 Zero matches. Maybe spellcheck is your friend.")
-
-        elif user_input.startswith("autograph:"):
-            query = user_input[10:].strip()
-            results = search_autograph_data(query)
-            if results:
-                for score, row in results:
-                    print(f"\n✍️ Autograph match ({score}%):\n{row.to_dict()}")
-            else:
-                print("🫠 No autographs found. Maybe they bailed on the signing table.")
-
-        elif user_input.startswith("disc:"):
-            disc_id = user_input[5:].strip()
-            df = get_disc(disc_id)
-            print(df.to_string(index=False) if not df.empty else f"🛑 No disc found for '{disc_id}'. Maybe it's imaginary.")
-
-        elif user_input.startswith("count:"):
-            keyword = user_input[6:].strip()
-            total = count_discs(keyword)
-            print(f"📦 '{keyword}' appears {total} times. That’s probably more than your monthly cardio.")
-
-        elif user_input.startswith("first disc:"):
-            name = user_input[11:].strip()
-            result = first_disc(name)
-            print(f"🎯 First match:\n{result.to_dict() if result is not None else '🛑 Nothing. Move along, Sherlock.'}")
-
-        elif user_input.startswith("login for:"):
-            alias = user_input[10:].strip()
-            creds = get_login(alias)
-            print(f"🔐 Credentials incoming:\n{creds if creds else '🛑 Login not found. Try remembering where you wrote it down.'}")
-
-        elif user_input.startswith("prefix:"):
-            prefix = user_input[7:].strip()
-            clouds = list_clouds_starting(prefix)
-            if clouds:
-                print("\n📡 Aliases matching your vibe:")
-                for c in clouds:
-                    print(f"• {c}")
-            else:
-                print("📡 No aliases found. Try a broader prefix before you start crying.")
-
         elif user_input.startswith("company:"):
             company = user_input[8:].strip()
-            df = filter_by_company(company)
-            print(df.to_string(index=False) if not df.empty else f"🛑 No events found for '{company}'. Even they forgot to show up.")
+            print_paged_results(core().filter_by_company_page, company, f"🛑 No events found for '{company}'. Even they forgot to show up.")
 
         elif user_input.startswith("date:"):
             date = user_input[5:].strip()
-            df = filter_by_date(date)
-            print(df.to_string(index=False) if not df.empty else f"🛑 No events for '{date}'. Maybe it's a holiday.")
+            try:
+                print_paged_results(core().filter_by_date_page, date, f"🛑 No events for '{date}'. Maybe it's a holiday.")
+            except QueryError as e:
+                print(f"🛑 {e}")
 
         else:
-            roast_unknown_command()
+            print_result(run_command(user_input, loginbot))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="Mark.py",
+        description="Query the MARK catalog. With no command, starts the interactive prompt."
+    )
+    parser.add_argument("command", nargs="*", help="One command, e.g. `search matrix` or `disc:42`")
+    parser.add_argument("-b", "--batch", metavar="FILE", help="Run one command per line from FILE (`-` for stdin)")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per command")
+    parser.add_argument("--logs", default=LOGS_FILE, help="Credentials file for `login for:` and `prefix:`")
+    args = parser.parse_args(argv)
+
+    loginbot = load_loginbot(args.logs)
+    if args.batch:
+        return run_batch(read_batch(args.batch), loginbot, args.json)
+    if args.command:
+        return run_batch([" ".join(args.command)], loginbot, args.json)
+
+    interactive(loginbot)
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
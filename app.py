@@ -4,10 +4,12 @@ import os
 from file_processor import FileProcessor
 from chatbot import MarkBot
 from loginbot import LoginBot
+from ingest_jobs import IngestJobRegistry
+from chat_history import ChatHistory
 
 # Initialize session state
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
+if 'chat_history' not in st.session_state:
+    st.session_state.chat_history = ChatHistory()
 if 'uploaded_files' not in st.session_state:
     st.session_state.uploaded_files = {}
 if 'file_processor' not in st.session_state:
@@ -16,6 +18,28 @@ if 'chatbot' not in st.session_state:
     st.session_state.chatbot = MarkBot()
 if 'loginbot' not in st.session_state:
     st.session_state.loginbot = LoginBot()
+if 'ingest_jobs' not in st.session_state:
+    st.session_state.ingest_jobs = IngestJobRegistry(st.session_state.file_processor)
+
+@st.fragment(run_every=1)
+def show_ingest_progress():
+    """Poll background ingestion jobs and publish finished files"""
+    registry = st.session_state.ingest_jobs
+    
+    for job in registry.jobs():
+        if job.status == 'failed':
+            st.error(job.describe())
+        elif job.status == 'done':
+            st.success(job.describe())
+        else:
+            st.progress(job.progress, text=job.describe())
+    
+    finished = registry.collect_finished()
+    st.session_state.uploaded_files.update(finished)
+    
+    # A full rerun refreshes the file list and stops this fragment from polling
+    if finished or not registry.has_active_jobs():
+        st.rerun()
 
 def main():
     st.set_page_config(
@@ -59,17 +83,24 @@ def main():
                     except Exception as e:
                         st.error(f"Error loading credentials: {str(e)}")
         
-        # Process uploaded files
+        # Queue new uploads for background processing so the chat stays usable
+        registry = st.session_state.ingest_jobs
         if uploaded_files:
             for uploaded_file in uploaded_files:
-                if uploaded_file.name not in st.session_state.uploaded_files:
-                    try:
-                        # Process the file
-                        file_data = st.session_state.file_processor.process_file(uploaded_file)
-                        st.session_state.uploaded_files[uploaded_file.name] = file_data
-                        st.success(f"✅ {uploaded_file.name} uploaded successfully!")
-                    except Exception as e:
-                        st.error(f"❌ Error processing {uploaded_file.name}: {str(e)}")
+                if uploaded_file.name not in st.session_state.uploaded_files and registry.should_submit(uploaded_file):
+                    registry.submit(uploaded_file)
+        
+        if registry.has_active_jobs():
+            show_ingest_progress()
+        else:
+            st.session_state.uploaded_files.update(registry.collect_finished())
+            for job in registry.jobs():
+                if job.status == 'failed':
+                    st.error(job.describe())
+                    # Forgetting the job lets the file still in the uploader be processed again
+                    if st.button("🔁 Retry", key=f"retry_{job.filename}"):
+                        registry.forget(job.filename)
+                        st.rerun()
         
         # Display uploaded files
         if st.session_state.uploaded_files:
@@ -82,20 +113,31 @@ def main():
                 with col2:
                     if st.button("🗑️", key=f"delete_{filename}", help="Delete file"):
                         del st.session_state.uploaded_files[filename]
+                        registry.forget(filename)
                         st.rerun()
         else:
             st.info("No files uploaded yet.")
         
         # Clear chat history button
         if st.button("🗑️ Clear Chat History"):
-            st.session_state.messages = []
+            st.session_state.chat_history.clear()
             st.rerun()
     
     # Main chat interface
     st.header("💬 Chat with Mark-bot")
     
-    # Display chat messages
-    for message in st.session_state.messages:
+    # Older turns are paged inside an expander so rerun cost stays flat
+    history = st.session_state.chat_history
+    if history.older_count():
+        with st.expander(f"🕰️ Earlier messages ({history.older_count()})"):
+            page = st.number_input("Page (1 = most recent)", min_value=1,
+                                   max_value=history.older_page_count(), value=1, key="history_page")
+            for message in history.older_page(page):
+                with st.chat_message(message["role"]):
+                    st.markdown(message["content"])
+    
+    # Display recent chat messages
+    for message in history.recent():
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
     
@@ -107,23 +149,21 @@ def main():
             return
         
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        history.append("user", prompt)
         
         # Display user message
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Generate bot response
+        # Generate bot response, streaming each file's results as they arrive
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response = st.session_state.chatbot.generate_response(
-                    prompt, 
-                    st.session_state.uploaded_files
-                )
-                st.markdown(response)
+            response = st.write_stream(st.session_state.chatbot.generate_response_stream(
+                prompt, 
+                st.session_state.uploaded_files
+            ))
         
         # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
+        history.append("assistant", response)
     
     # Display instructions if no files uploaded
     if not st.session_state.uploaded_files:
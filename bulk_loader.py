@@ -0,0 +1,65 @@
+import sqlite3
+from itertools import chain
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+from mark_query import quote_identifier
+
+# Pragmas relaxed while a table is being filled, restored afterwards
+LOAD_PRAGMAS = {'journal_mode': 'OFF', 'synchronous': 'OFF'}
+
+
+def infer_column_types(columns: Sequence[str], rows: List[Tuple[Any, ...]]) -> List[str]:
+    """SQLite column types from sample rows: INTEGER, REAL, or TEXT for anything else"""
+    types = []
+    for position in range(len(columns)):
+        values = [row[position] for row in rows if row[position] is not None]
+        if values and all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+            types.append('INTEGER')
+        elif values and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            types.append('REAL')
+        else:
+            types.append('TEXT')
+    return types
+
+
+def load_rows(conn: sqlite3.Connection, table: str, columns: Sequence[str],
+              chunks: Iterable[List[Tuple[Any, ...]]], types: Optional[Sequence[str]] = None) -> int:
+    """
+    Replace a table with streamed row chunks in a single transaction
+
+    Column types come from the first chunk unless given. Each chunk goes
+    through the same prepared INSERT with executemany, so memory stays
+    bounded by the chunk size. Journaling and syncing are switched off
+    for the load, which is only safe on a database that is not yet live.
+
+    Returns:
+        Number of rows written
+    """
+    chunks = iter(chunks)
+    first = next(chunks, [])
+    types = list(types) if types is not None else infer_column_types(columns, first)
+
+    saved = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in LOAD_PRAGMAS}
+    if conn.in_transaction:
+        conn.commit()
+    for name, value in LOAD_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+    quoted = quote_identifier(table)
+    definitions = ", ".join(f"{quote_identifier(column)} {column_type}" for column, column_type in zip(columns, types))
+    insert = f"INSERT INTO {quoted} VALUES ({', '.join('?' * len(columns))})"
+    rows = 0
+    try:
+        conn.execute("BEGIN")
+        conn.execute(f"DROP TABLE IF EXISTS {quoted}")
+        conn.execute(f"CREATE TABLE {quoted} ({definitions})")
+        for chunk in chain([first], chunks):
+            conn.executemany(insert, chunk)
+            rows += len(chunk)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        for name, value in saved.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+    return rows
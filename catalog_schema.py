@@ -0,0 +1,136 @@
+import re
+import sqlite3
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Catalog columns the app relies on, by canonical name, with their declared types
+CATALOG_COLUMNS = {
+    'disc_no': 'TEXT',
+    'company': 'TEXT',
+    'date': 'TEXT',
+}
+# Other header spellings, after canonicalization, that mean a catalog column
+HEADER_ALIASES = {
+    'disc': 'disc_no',
+    'disc_number': 'disc_no',
+    'disc_id': 'disc_no',
+    'dvd': 'disc_no',
+    'dvd_no': 'disc_no',
+    'event_date': 'date',
+}
+REQUIRED_COLUMNS = ['disc_no']
+# Column whose values also get a normalized ISO copy for ranges
+DATE_COLUMN = 'date'
+
+# Metadata tables written next to mark_table
+COLUMNS_TABLE = 'mark_columns'
+META_TABLE = 'mark_meta'
+SCHEMA_VERSION = 1
+
+
+class SchemaError(ValueError):
+    """Raised when a workbook cannot be loaded as the catalog"""
+
+
+def canonical_name(header: Any) -> str:
+    """Stable SQL-friendly column name: `Disc #` -> disc_no, ` Event  Name ` -> event_name"""
+    text = str(header).strip().lower().replace('#', ' no ')
+    name = re.sub(r'[^0-9a-z]+', '_', text).strip('_') or 'column'
+    if name[0].isdigit():
+        name = f"c_{name}"
+    return HEADER_ALIASES.get(name, name)
+
+
+def build_schema(headers: Sequence[str], inferred_types: Sequence[str]) -> List[Dict[str, str]]:
+    """
+    Map sheet headers to canonical columns
+
+    Catalog columns keep their declared type; others use the inferred one.
+    Headers that collapse to the same name get _2, _3... suffixes.
+
+    Returns:
+        One {'name', 'display_name', 'type'} dictionary per column, in sheet order
+    """
+    schema, seen = [], {}
+    for header, inferred_type in zip(headers, inferred_types):
+        name = canonical_name(header)
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = f"{name}_{seen[name]}"
+        schema.append({
+            'name': name,
+            'display_name': str(header),
+            'type': CATALOG_COLUMNS.get(name, inferred_type),
+        })
+    return schema
+
+
+def validate_schema(schema: List[Dict[str, str]], sample_rows: List[Tuple[Any, ...]]) -> List[str]:
+    """
+    Check a workbook's schema before it replaces the catalog
+
+    Raises:
+        SchemaError: when the sheet is empty or a required column is missing
+
+    Returns:
+        Warnings worth showing but not worth refusing the load over
+    """
+    if not schema:
+        raise SchemaError("The catalog sheet has no header row")
+
+    names = [column['name'] for column in schema]
+    missing = [name for name in REQUIRED_COLUMNS if name not in names]
+    if missing:
+        headers = ', '.join(column['display_name'] for column in schema)
+        raise SchemaError(f"Missing required column(s) {', '.join(missing)}; the sheet has: {headers}")
+
+    warnings = []
+    for position, column in enumerate(schema):
+        if column['display_name'].startswith('Unnamed: '):
+            warnings.append(f"Column {position + 1} has no header and was named {column['name']}")
+        elif column['name'] != canonical_name(column['display_name']):
+            warnings.append(f"Header '{column['display_name']}' is repeated and was named {column['name']}")
+
+    if sample_rows and 'disc_no' in names:
+        position = names.index('disc_no')
+        blank = sum(1 for row in sample_rows if row[position] is None)
+        if blank:
+            warnings.append(f"{blank} of the first {len(sample_rows)} rows have no disc number")
+    return warnings
+
+
+def write_metadata(conn: sqlite3.Connection, schema: List[Dict[str, str]], meta: Dict[str, Any]) -> None:
+    """Store display names, types and sync details alongside mark_table"""
+    conn.execute(f"DROP TABLE IF EXISTS {COLUMNS_TABLE}")
+    conn.execute(
+        f"CREATE TABLE {COLUMNS_TABLE} (name TEXT PRIMARY KEY, display_name TEXT NOT NULL, "
+        f"type TEXT NOT NULL, position INTEGER NOT NULL)"
+    )
+    conn.executemany(
+        f"INSERT INTO {COLUMNS_TABLE} VALUES (?, ?, ?, ?)",
+        [(column['name'], column['display_name'], column['type'], position) for position, column in enumerate(schema)]
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {META_TABLE} VALUES (?, ?)",
+        [(key, str(value)) for key, value in {'schema_version': SCHEMA_VERSION, **meta}.items()]
+    )
+    conn.commit()
+
+
+def has_metadata(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [COLUMNS_TABLE]
+    ).fetchone() is not None
+
+
+def read_display_names(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Canonical column name -> original header, empty for databases without metadata"""
+    if not has_metadata(conn):
+        return {}
+    return dict(conn.execute(f"SELECT name, display_name FROM {COLUMNS_TABLE} ORDER BY position"))
+
+
+def read_meta(conn: sqlite3.Connection) -> Dict[str, str]:
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [META_TABLE]).fetchone() is None:
+        return {}
+    return dict(conn.execute(f"SELECT key, value FROM {META_TABLE}"))
@@ -0,0 +1,68 @@
+import hashlib
+from typing import Dict, List
+
+
+class ChatHistory:
+    """Bounded chat transcript that keeps recent turns live and pages the rest"""
+
+    def __init__(self, max_messages: int = 500, recent_count: int = 20, page_size: int = 10,
+                 inline_limit: int = 2000):
+        self.max_messages = max_messages
+        self.recent_count = recent_count
+        self.page_size = page_size
+        self.inline_limit = inline_limit
+        self._messages: List[Dict[str, str]] = []
+        # Large message bodies stored once, keyed by content hash, with a reference count
+        self._store: Dict[str, str] = {}
+        self._refcounts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def append(self, role: str, content: str) -> None:
+        """Add a message, storing large bodies by reference"""
+        if len(content) > self.inline_limit:
+            ref = hashlib.sha1(content.encode('utf-8')).hexdigest()
+            self._store.setdefault(ref, content)
+            self._refcounts[ref] = self._refcounts.get(ref, 0) + 1
+            self._messages.append({'role': role, 'ref': ref})
+        else:
+            self._messages.append({'role': role, 'content': content})
+
+        while len(self._messages) > self.max_messages:
+            self._release(self._messages.pop(0))
+
+    def _release(self, message: Dict[str, str]) -> None:
+        ref = message.get('ref')
+        if ref is None:
+            return
+        self._refcounts[ref] -= 1
+        if self._refcounts[ref] == 0:
+            del self._refcounts[ref]
+            del self._store[ref]
+
+    def _resolve(self, message: Dict[str, str]) -> Dict[str, str]:
+        if 'ref' in message:
+            return {'role': message['role'], 'content': self._store[message['ref']]}
+        return message
+
+    def recent(self) -> List[Dict[str, str]]:
+        """The last turns, rendered in full on every rerun"""
+        return [self._resolve(message) for message in self._messages[-self.recent_count:]]
+
+    def older_count(self) -> int:
+        return max(0, len(self._messages) - self.recent_count)
+
+    def older_page_count(self) -> int:
+        return -(-self.older_count() // self.page_size)
+
+    def older_page(self, page: int) -> List[Dict[str, str]]:
+        """One page of older messages; page 1 is the most recent of them"""
+        end = self.older_count() - (page - 1) * self.page_size
+        start = max(0, end - self.page_size)
+        return [self._resolve(message) for message in self._messages[start:max(0, end)]]
+
+    def clear(self) -> None:
+        self._messages = []
+        self._store = {}
+        self._refcounts = {}
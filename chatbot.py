@@ -1,16 +1,30 @@
 import re
 import pandas as pd
-from typing import Dict, Any, List
+from collections import deque
+from typing import Dict, Any, List, Iterator
 from file_processor import FileProcessor
-from rapidfuzz import fuzz
+from query_executor import QueryExecutor
 from loginbot import LoginBot
+from dtype_optimizer import format_bytes
+from summary_stats import format_number
+from response_builder import ResponseBuilder, MAX_ROWS, truncate, inline_row
+from row_index import RowAddressIndex
+from search_config import search_config
+
+# `row 42`, `rows 100-200`, `rows 5 to 9`
+ROW_PATTERN = re.compile(r'\brows?\s+(\d+)(?:\s*(?:-|–|to|\.\.)\s*(\d+))?', re.IGNORECASE)
+# What may follow a row number: `in Sheet2`, `of LIST.xlsx`, `overall`
+ROW_SCOPE_PATTERN = re.compile(r'\s+(?:(?:in|of|from)\s+(?:sheet\s+)?["\']?(.+?)["\']?|(overall))\s*[?.!]*\s*$', re.IGNORECASE)
 
 class MarkBot:
     """Main chatbot class for handling user queries about uploaded files"""
     
     def __init__(self):
         self.file_processor = FileProcessor()
-        self.conversation_context = []
+        # Scans uploaded files and sheets concurrently on the process-wide pool, results kept in upload order
+        self.query_executor = QueryExecutor()
+        # Only the most recent turns are kept as context
+        self.conversation_context = deque(maxlen=20)
         self.loginbot = LoginBot()
     
     def generate_response(self, user_query: str, uploaded_files: Dict[str, Any]) -> str:
@@ -27,15 +41,39 @@ class MarkBot:
         try:
             # Analyze the query to determine intent
             intent = self._analyze_query_intent(user_query)
+            self.conversation_context.append({'query': user_query, 'intent': intent['type']})
             
             # Generate response based on intent
-            response = self._generate_response_by_intent(intent, user_query, uploaded_files)
+            response = "".join(self._stream_response_by_intent(intent, user_query, uploaded_files))
             
             return response
             
         except Exception as e:
             return f"Sorry, I encountered an error processing your query: {str(e)}"
     
+    def generate_response_stream(self, user_query: str, uploaded_files: Dict[str, Any]) -> Iterator[str]:
+        """
+        Generate response to user query as partial markdown chunks
+        
+        Multi-file commands yield each file's section as soon as it is scanned,
+        so the first results show up before the slowest file finishes.
+        
+        Args:
+            user_query: User's question
+            uploaded_files: Dictionary of processed file data
+            
+        Yields:
+            Markdown fragments that join into the full response
+        """
+        try:
+            intent = self._analyze_query_intent(user_query)
+            self.conversation_context.append({'query': user_query, 'intent': intent['type']})
+            
+            yield from self._stream_response_by_intent(intent, user_query, uploaded_files)
+            
+        except Exception as e:
+            yield f"\n\nSorry, I encountered an error processing your query: {str(e)}"
+    
     def _analyze_query_intent(self, query: str) -> Dict[str, Any]:
         """Analyze user query to determine intent and extract key information"""
         query_lower = query.lower()
@@ -92,9 +130,16 @@ class MarkBot:
         
         # Extract specific targets
         if 'row' in query_lower:
-            row_match = re.search(r'row\s+(\d+)', query_lower)
+            row_match = ROW_PATTERN.search(query)
             if row_match:
-                intent['target'] = {'type': 'row', 'value': int(row_match.group(1))}
+                first = int(row_match.group(1))
+                scope_match = ROW_SCOPE_PATTERN.match(query, row_match.end())
+                intent['target'] = {
+                    'type': 'row',
+                    'value': first,
+                    'end': max(int(row_match.group(2) or first), first),
+                    'scope': (scope_match.group(1) or scope_match.group(2).lower()) if scope_match else None
+                }
         
         if 'column' in query_lower:
             col_match = re.search(r'column\s+(\w+)', query_lower)
@@ -103,6 +148,23 @@ class MarkBot:
         
         return intent
     
+    def _stream_response_by_intent(self, intent: Dict[str, Any], query: str, uploaded_files: Dict[str, Any]) -> Iterator[str]:
+        """Yield the response in chunks for intents that scan file by file"""
+        command = intent['target']['type'] if intent['target'] else None
+        
+        if intent['type'] == 'search':
+            if command == 'search_command':
+                return self._iter_search_command(intent, uploaded_files)
+            return self._iter_search_response(query, uploaded_files)
+        
+        if intent['type'] == 'count' and command == 'count_command':
+            return self._iter_count_command(intent, uploaded_files)
+        
+        if intent['type'] == 'general':
+            return self._iter_general_response(query, uploaded_files)
+        
+        return iter([self._generate_response_by_intent(intent, query, uploaded_files)])
+    
     def _generate_response_by_intent(self, intent: Dict[str, Any], query: str, uploaded_files: Dict[str, Any]) -> str:
         """Generate response based on analyzed intent"""
         
@@ -164,7 +226,7 @@ I can help you analyze your uploaded files! Here's what I can do:
 - Show me the data in sheet X
 - What columns are in this file?
 - How many rows are there?
-- Show me row 5
+- Show me row 5 (or row 5 in Sheet2, rows 100-200, row 250 overall)
 - Find all data containing "keyword"
 - Summarize the Excel file
 
@@ -176,6 +238,7 @@ I can help you analyze your uploaded files! Here's what I can do:
 
 **Special Mark-bot commands:**
 - `search:keyword` - Advanced fuzzy search with scores
+- `search:[Column] keyword` or `search:column=keyword` - Search one column only
 - `count:keyword` - Count occurrences of keyword
 - `first disc:name` - Find first match for disc name
 - `disc:ID` - Find specific disc by ID
@@ -196,81 +259,102 @@ Just ask me naturally about your files or use the special commands!
         if not uploaded_files:
             return "No files uploaded yet. Please upload some files first!"
         
-        response = "📊 **File Summary**\n\n"
+        response = ResponseBuilder("📊 **File Summary**\n\n")
         
         for filename, file_data in uploaded_files.items():
-            response += f"**{filename}**\n"
+            response.line(f"**{filename}**")
             
             if file_data['type'] == 'excel':
                 summary = file_data['summary']
-                response += f"- Type: Excel file\n"
-                response += f"- Sheets: {summary['total_sheets']} ({', '.join(summary['sheet_names'])})\n"
-                response += f"- Total rows: {summary['total_rows']}\n"
-                response += f"- Total columns: {summary['total_columns']}\n\n"
+                response.line(f"- Type: Excel file")
+                response.line(f"- Sheets: {summary['total_sheets']} ({', '.join(summary['sheet_names'])})")
+                response.line(f"- Total rows: {summary['total_rows']}")
+                response.line(f"- Total columns: {summary['total_columns']}\n")
                 
                 # Show sheet details
                 for sheet_name, sheet_data in file_data['sheets'].items():
-                    response += f"  **Sheet: {sheet_name}**\n"
-                    response += f"  - Dimensions: {sheet_data['shape'][0]} rows × {sheet_data['shape'][1]} columns\n"
-                    response += f"  - Columns: {', '.join(sheet_data['columns'][:5])}"
+                    response.line(f"  **Sheet: {sheet_name}**")
+                    response.line(f"  - Dimensions: {sheet_data['shape'][0]} rows × {sheet_data['shape'][1]} columns")
+                    response.add(f"  - Columns: {', '.join(map(str, sheet_data['columns'][:5]))}")
                     if len(sheet_data['columns']) > 5:
-                        response += f" ... ({len(sheet_data['columns'])} total)"
-                    response += "\n\n"
+                        response.add(f" ... ({len(sheet_data['columns'])} total)")
+                    response.line()
+                    memory = sheet_data['memory']
+                    response.line(f"  - Memory: {format_bytes(memory['memory_after'])} (saved {format_bytes(memory['memory_saved'])})")
+                    
+                    stats = self.file_processor.get_sheet_summary(sheet_data)
+                    numeric = list(stats.get('numeric_summary', {}).items())
+                    if numeric:
+                        prefix = "≈ " if stats['approximate'] else ""
+                        response.add("  - Numeric: " + "; ".join(
+                            f"{col} mean {format_number(values['mean'])}, median {prefix}{format_number(values['50%'])}"
+                            for col, values in numeric[:3]
+                        ))
+                        if len(numeric) > 3:
+                            response.add(f" ... ({len(numeric)} numeric columns)")
+                        response.line()
+                    if stats['approximate']:
+                        response.line(f"  - _Approximate: medians from a {stats['sample_size']:,}-row sample_")
+                    response.line()
             
             elif file_data['type'] == 'text':
-                response += f"- Type: Text file\n"
-                response += f"- Lines: {file_data['line_count']}\n"
-                response += f"- Words: {file_data['word_count']}\n"
-                response += f"- Characters: {file_data['char_count']}\n"
+                response.line(f"- Type: Text file")
+                response.line(f"- Lines: {file_data['line_count']}")
+                response.line(f"- Words: {file_data['word_count']}")
+                response.line(f"- Characters: {file_data['char_count']}")
                 
                 if file_data['summary']['top_words']:
                     top_words = [f"{word} ({count})" for word, count in file_data['summary']['top_words'][:5]]
-                    response += f"- Top words: {', '.join(top_words)}\n"
-                response += "\n"
+                    response.line(f"- Top words: {', '.join(top_words)}")
+                response.line()
         
-        return response
+        return response.build()
     
     def _generate_search_response(self, query: str, uploaded_files: Dict[str, Any]) -> str:
         """Generate search response"""
+        return "".join(self._iter_search_response(query, uploaded_files))
+    
+    def _iter_search_response(self, query: str, uploaded_files: Dict[str, Any]) -> Iterator[str]:
+        """Yield search results for a natural-language query one file at a time"""
         # Extract search terms from query
         search_terms = self._extract_search_terms(query)
         
         if not search_terms:
-            return "I couldn't identify what to search for. Please specify what you're looking for."
+            yield "I couldn't identify what to search for. Please specify what you're looking for."
+            return
         
-        response = f"🔍 **Search results for: {', '.join(search_terms)}**\n\n"
+        yield f"🔍 **Search results for: {', '.join(search_terms)}**\n\n"
         found_results = False
         
-        for filename, file_data in uploaded_files.items():
-            file_results = []
-            
-            for term in search_terms:
-                results = self.file_processor.search_in_file(term, file_data)
-                file_results.extend(results)
+        # Every term starts on every file now; results are read back file by file
+        searches = [self._search_files(term, uploaded_files) for term in search_terms]
+        
+        for per_term in zip(*searches):
+            filename = per_term[0][0]
+            file_results = [result for _, results in per_term for result in results]
             
             if file_results:
                 found_results = True
-                response += f"**{filename}:**\n"
+                response = ResponseBuilder(f"**{filename}:**\n")
                 
                 for result in file_results:
-                    response += f"- {result['description']}\n"
+                    response.line(f"- {result['description']}")
                     
                     if result['type'] == 'fuzzy_match' and len(result['matches']) <= 5:
                         for score, match in result['matches']:
-                            response += f"  - Match ({score}%): {match}\n"
+                            response.line(f"  - Match ({score}%): {inline_row(match)}")
                     elif result['type'] == 'fuzzy_text_match' and len(result['matches']) <= 5:
                         for match in result['matches']:
-                            response += f"  - Line {match['line_number']} ({match['score']}%): {match['content']}\n"
+                            response.line(f"  - Line {match['line_number']} ({match['score']}%): {truncate(match['content'])}")
                     elif result['type'] == 'column_match':
                         for col, score in zip(result['columns'], result.get('scores', [])):
-                            response += f"  - Column: {col} ({score}%)\n"
+                            response.line(f"  - Column: {col} ({score}%)")
                 
-                response += "\n"
+                response.line()
+                yield response.build()
         
         if not found_results:
-            response += "No results found for your search terms."
-        
-        return response
+            yield "No results found for your search terms."
     
     def _extract_search_terms(self, query: str) -> List[str]:
         """Extract search terms from query"""
@@ -293,194 +377,239 @@ Just ask me naturally about your files or use the special commands!
         
         return quoted_terms
     
+    
     def _generate_show_response(self, intent: Dict[str, Any], uploaded_files: Dict[str, Any]) -> str:
         """Generate show response"""
         if intent['target'] and intent['target']['type'] == 'row':
-            return self._show_specific_row(intent['target']['value'], uploaded_files)
+            return self._show_rows(intent['target'], uploaded_files)
         
         # Default show response - show file contents
-        response = "📋 **File Contents**\n\n"
+        response = ResponseBuilder("📋 **File Contents**\n\n")
         
         for filename, file_data in uploaded_files.items():
-            response += f"**{filename}**\n"
+            response.line(f"**{filename}**")
             
             if file_data['type'] == 'excel':
                 for sheet_name, sheet_data in file_data['sheets'].items():
-                    response += f"\n**Sheet: {sheet_name}**\n"
+                    response.line(f"\n**Sheet: {sheet_name}**")
                     df = sheet_data['data']
                     
                     # Show first few rows
                     if len(df) > 0:
-                        response += f"Columns: {', '.join(df.columns.tolist())}\n\n"
-                        response += "First 5 rows:\n"
+                        response.line(f"Columns: {', '.join(map(str, df.columns.tolist()))}\n")
+                        response.line("First 5 rows:")
                         
                         for i, row in df.head().iterrows():
-                            response += f"Row {i+1}: {dict(row)}\n"
+                            response.line(f"Row {i+1}: {inline_row(row)}")
                     else:
-                        response += "Empty sheet\n"
+                        response.line("Empty sheet")
             
             elif file_data['type'] == 'text':
                 lines = file_data['lines'][:10]  # Show first 10 lines
-                response += f"First {len(lines)} lines:\n"
+                response.line(f"First {len(lines)} lines:")
                 for i, line in enumerate(lines, 1):
-                    response += f"{i}: {line}\n"
+                    response.line(f"{i}: {truncate(line)}")
                 
                 if len(file_data['lines']) > 10:
-                    response += f"... ({len(file_data['lines']) - 10} more lines)\n"
+                    response.line(f"... ({len(file_data['lines']) - 10} more lines)")
             
-            response += "\n"
+            response.line()
         
-        return response
+        return response.build()
     
-    def _show_specific_row(self, row_number: int, uploaded_files: Dict[str, Any]) -> str:
-        """Show specific row from Excel files"""
-        response = f"📊 **Row {row_number}**\n\n"
-        found_data = False
+    def _show_rows(self, target: Dict[str, Any], uploaded_files: Dict[str, Any]) -> str:
+        """
+        Show a row or row range from Excel sheets (or lines from text files)
         
-        for filename, file_data in uploaded_files.items():
-            if file_data['type'] == 'excel':
-                for sheet_name, sheet_data in file_data['sheets'].items():
-                    df = sheet_data['data']
-                    
-                    if row_number <= len(df):
-                        row_data = df.iloc[row_number - 1]
-                        response += f"**{filename} - Sheet: {sheet_name}**\n"
-                        
-                        for col, value in row_data.items():
-                            response += f"- {col}: {value}\n"
-                        
-                        response += "\n"
-                        found_data = True
+        Sheets are picked from the row index built at upload, and each one is
+        sliced once with iloc. A scope limits the rows to one sheet or file;
+        `overall` numbers rows end to end across every file in upload order.
+        """
+        last = target.get('end') or target['value']
+        if last < 1:
+            return "Rows are numbered from 1. Try `row 1` or `rows 1-10`."
+        # `rows 0-5` starts at the first row
+        first = max(target['value'], 1)
+        scope = target.get('scope')
+        index = RowAddressIndex.combine(uploaded_files)
+        
+        label = f"Row {first}" if last == first else f"Rows {first}-{last}"
+        if scope:
+            label += " overall" if scope == 'overall' else f" in {scope}"
+        response = ResponseBuilder(f"📊 **{label}**\n\n")
+        
+        if scope == 'overall':
+            spans = index.span(first, last)
+        else:
+            addresses = index.find(scope)
+            if scope and not addresses:
+                return response.add(f"No sheet or file named '{scope}'. Try one of: "
+                                    f"{', '.join(address.sheet or address.filename for address in index.addresses)}").build()
+            spans = [(address, first, min(last, address.rows)) for address in addresses if first <= address.rows]
+        
+        for address, start, end in spans:
+            file_data = uploaded_files[address.filename]
+            
+            if address.sheet is None:
+                if 'index' not in file_data:
+                    continue
+                if start == end:
+                    response.line(f"**{address.filename} - Line {start}:** {truncate(self.file_processor.get_text_line(file_data, start))}\n")
+                    continue
+                response.line(f"**{address.filename} - Lines {start}-{end}**")
+                for line_number in range(start, min(end, start + MAX_ROWS - 1) + 1):
+                    response.line(f"{line_number}: {truncate(self.file_processor.get_text_line(file_data, line_number))}")
+            else:
+                df = file_data['sheets'][address.sheet]['data']
+                response.line(f"**{address.filename} - Sheet: {address.sheet}**{f' (row {start})' if start != first else ''}")
+                if start == end:
+                    response.fields(df.iloc[start - 1], bold=False)
+                    response.line()
+                    continue
+                for offset, (_, row) in enumerate(df.iloc[start - 1:min(end, start + MAX_ROWS - 1)].iterrows()):
+                    response.line(f"Row {start + offset}: {inline_row(row)}")
+            
+            response.more(end - start + 1 - MAX_ROWS, "rows")
+            response.line()
         
-        if not found_data:
-            response += f"Row {row_number} not found in any Excel files."
+        if not spans:
+            response.add(f"{label} not found in any uploaded files.")
         
-        return response
+        return response.build()
     
     def _generate_count_response(self, uploaded_files: Dict[str, Any]) -> str:
         """Generate count response"""
-        response = "🔢 **File Statistics**\n\n"
+        response = ResponseBuilder("🔢 **File Statistics**\n\n")
         
         for filename, file_data in uploaded_files.items():
-            response += f"**{filename}**\n"
+            response.line(f"**{filename}**")
             
             if file_data['type'] == 'excel':
                 summary = file_data['summary']
-                response += f"- Total sheets: {summary['total_sheets']}\n"
-                response += f"- Total rows: {summary['total_rows']}\n"
-                response += f"- Total columns: {summary['total_columns']}\n"
+                response.line(f"- Total sheets: {summary['total_sheets']}")
+                response.line(f"- Total rows: {summary['total_rows']}")
+                response.line(f"- Total columns: {summary['total_columns']}")
                 
                 for sheet_name, sheet_data in file_data['sheets'].items():
-                    response += f"  - {sheet_name}: {sheet_data['shape'][0]} rows × {sheet_data['shape'][1]} columns\n"
+                    response.line(f"  - {sheet_name}: {sheet_data['shape'][0]} rows × {sheet_data['shape'][1]} columns")
             
             elif file_data['type'] == 'text':
-                response += f"- Lines: {file_data['line_count']}\n"
-                response += f"- Words: {file_data['word_count']}\n"
-                response += f"- Characters: {file_data['char_count']}\n"
+                response.line(f"- Lines: {file_data['line_count']}")
+                response.line(f"- Words: {file_data['word_count']}")
+                response.line(f"- Characters: {file_data['char_count']}")
             
-            response += "\n"
+            response.line()
         
-        return response
+        return response.build()
     
     def _generate_column_info_response(self, uploaded_files: Dict[str, Any]) -> str:
         """Generate column information response"""
-        response = "📊 **Column Information**\n\n"
+        response = ResponseBuilder("📊 **Column Information**\n\n")
         found_excel = False
         
         for filename, file_data in uploaded_files.items():
             if file_data['type'] == 'excel':
                 found_excel = True
-                response += f"**{filename}**\n"
+                response.line(f"**{filename}**")
                 
                 for sheet_name, sheet_data in file_data['sheets'].items():
-                    response += f"\n**Sheet: {sheet_name}**\n"
-                    columns = sheet_data['columns']
+                    response.line(f"\n**Sheet: {sheet_name}**")
                     dtypes = sheet_data['dtypes']
                     
-                    for col in columns:
-                        response += f"- {col} ({dtypes[col]})\n"
+                    for col in sheet_data['columns']:
+                        response.line(f"- {col} ({dtypes[col]})")
                 
-                response += "\n"
+                response.line()
         
         if not found_excel:
-            response += "No Excel files found. Column information is only available for Excel files."
+            response.add("No Excel files found. Column information is only available for Excel files.")
         
-        return response
+        return response.build()
     
     def _generate_sheet_info_response(self, uploaded_files: Dict[str, Any]) -> str:
         """Generate sheet information response"""
-        response = "📋 **Sheet Information**\n\n"
+        response = ResponseBuilder("📋 **Sheet Information**\n\n")
         found_excel = False
         
         for filename, file_data in uploaded_files.items():
             if file_data['type'] == 'excel':
                 found_excel = True
-                response += f"**{filename}**\n"
+                response.line(f"**{filename}**")
                 
                 for sheet_name, sheet_data in file_data['sheets'].items():
-                    response += f"- **{sheet_name}**: {sheet_data['shape'][0]} rows × {sheet_data['shape'][1]} columns\n"
-                    response += f"  Columns: {', '.join(sheet_data['columns'])}\n"
+                    response.line(f"- **{sheet_name}**: {sheet_data['shape'][0]} rows × {sheet_data['shape'][1]} columns")
+                    response.line(f"  Columns: {', '.join(map(str, sheet_data['columns']))}")
                 
-                response += "\n"
+                response.line()
         
         if not found_excel:
-            response += "No Excel files found. Sheet information is only available for Excel files."
+            response.add("No Excel files found. Sheet information is only available for Excel files.")
         
-        return response
+        return response.build()
     
     def _generate_row_info_response(self, intent: Dict[str, Any], uploaded_files: Dict[str, Any]) -> str:
         """Generate row information response"""
         if intent['target'] and intent['target']['type'] == 'row':
-            return self._show_specific_row(intent['target']['value'], uploaded_files)
+            return self._show_rows(intent['target'], uploaded_files)
         
         # General row information
-        response = "📊 **Row Information**\n\n"
-        
-        for filename, file_data in uploaded_files.items():
-            if file_data['type'] == 'excel':
-                response += f"**{filename}**\n"
-                
-                for sheet_name, sheet_data in file_data['sheets'].items():
-                    response += f"- {sheet_name}: {sheet_data['shape'][0]} rows\n"
-                
-                response += "\n"
-        
-        return response
+        response = ResponseBuilder("📊 **Row Information**\n\n")
+        current_file = None
+        
+        for address in RowAddressIndex.combine(uploaded_files).addresses:
+            if address.sheet is None:
+                continue
+            if address.filename != current_file:
+                if current_file is not None:
+                    response.line()
+                response.line(f"**{address.filename}**")
+                current_file = address.filename
+            overall = f" (rows {address.start + 1}-{address.start + address.rows} overall)" if address.rows else ""
+            response.line(f"- {address.sheet}: {address.rows} rows{overall}")
+        
+        if current_file is not None:
+            response.line()
+        
+        return response.build()
     
     def _generate_general_response(self, query: str, uploaded_files: Dict[str, Any]) -> str:
         """Generate general response for unrecognized queries"""
+        return "".join(self._iter_general_response(query, uploaded_files))
+    
+    def _iter_general_response(self, query: str, uploaded_files: Dict[str, Any]) -> Iterator[str]:
+        """Yield keyword findings one file at a time for unrecognized queries"""
         # Try to find relevant information based on keywords
         keywords = [word.lower() for word in query.split() if len(word) > 3]
         
         if not keywords:
-            return "I'm not sure what you're asking about. Try asking about your files or type 'help' for available commands."
+            yield "I'm not sure what you're asking about. Try asking about your files or type 'help' for available commands."
+            return
         
-        # Search for keywords in files
-        response = f"🔍 I found some information related to your query:\n\n"
+        # Search for keywords in files; the header waits for the first finding
         found_something = False
+        searches = [(keyword, self._search_files(keyword, uploaded_files)) for keyword in keywords]
         
-        for keyword in keywords:
-            for filename, file_data in uploaded_files.items():
-                results = self.file_processor.search_in_file(keyword, file_data)
-                
+        for keyword, search in searches:
+            for filename, results in search:
                 if results:
+                    if not found_something:
+                        yield "🔍 I found some information related to your query:\n\n"
                     found_something = True
-                    response += f"**{filename}** (searching for '{keyword}'):\n"
+                    response = ResponseBuilder(f"**{filename}** (searching for '{keyword}'):\n")
                     
                     for result in results[:3]:  # Limit to top 3 results
-                        response += f"- {result['description']}\n"
+                        response.line(f"- {result['description']}")
                     
-                    response += "\n"
+                    response.line()
+                    yield response.build()
         
         if not found_something:
-            response = "I couldn't find specific information for your query. You can ask me to:\n"
-            response += "- Show file contents\n"
-            response += "- Search for specific terms\n"
-            response += "- Provide file summaries\n"
-            response += "- Show column/row information\n"
-            response += "- Type 'help' for more options"
-        
-        return response
+            yield ("I couldn't find specific information for your query. You can ask me to:\n"
+                   "- Show file contents\n"
+                   "- Search for specific terms\n"
+                   "- Provide file summaries\n"
+                   "- Show column/row information\n"
+                   "- Type 'help' for more options")
     
     def _handle_first_disc_command(self, intent: Dict[str, Any], uploaded_files: Dict[str, Any]) -> str:
         """Handle first disc command - find the first match for a query"""
@@ -488,23 +617,18 @@ Just ask me naturally about your files or use the special commands!
         
         for filename, file_data in uploaded_files.items():
             if file_data['type'] == 'excel':
-                results = self.file_processor.search_in_file(query, file_data)
+                match = self.file_processor.first_match(query, file_data)
                 
-                if results:
-                    for result in results:
-                        if result['type'] == 'fuzzy_match' and result['matches']:
-                            first_match = result['matches'][0]
-                            score, match_data = first_match
-                            
-                            response = f"🎯 **First disc match for '{query}':**\n\n"
-                            response += f"**File:** {filename}\n"
-                            response += f"**Sheet:** {result['sheet']}\n"
-                            response += f"**Match Score:** {score}%\n\n"
-                            
-                            for key, value in match_data.items():
-                                response += f"- **{key}:** {value}\n"
-                            
-                            return response
+                if match:
+                    sheet_name, score, row_id = match
+                    
+                    response = ResponseBuilder(f"🎯 **First disc match for '{query}':**\n\n")
+                    response.line(f"**File:** {filename}")
+                    response.line(f"**Sheet:** {sheet_name}")
+                    response.line(f"**Match Score:** {score}%\n")
+                    response.fields(file_data['sheets'][sheet_name]['data'].iloc[row_id])
+                    
+                    return response.build()
         
         return f"🛑 No disc found for '{query}'. Maybe it's imaginary."
     
@@ -518,22 +642,22 @@ Just ask me naturally about your files or use the special commands!
                     df = sheet_data['data']
                     
                     # Look for disc ID in common column names
-                    disc_columns = [col for col in df.columns if 'disc' in col.lower() or 'id' in col.lower()]
+                    disc_columns = [col for col in df.columns if 'disc' in str(col).lower() or 'id' in str(col).lower()]
                     
                     for col in disc_columns:
-                        matches = df[df[col].astype(str).str.contains(disc_id, case=False, na=False)]
+                        matches = df.iloc[self.file_processor.rows_containing(disc_id, sheet_data, [col])]
                         
                         if not matches.empty:
-                            response = f"💿 **Disc '{disc_id}' found:**\n\n"
-                            response += f"**File:** {filename}\n"
-                            response += f"**Sheet:** {sheet_name}\n\n"
+                            response = ResponseBuilder(f"💿 **Disc '{disc_id}' found:**\n\n")
+                            response.line(f"**File:** {filename}")
+                            response.line(f"**Sheet:** {sheet_name}\n")
                             
-                            for _, row in matches.iterrows():
-                                for key, value in row.items():
-                                    response += f"- **{key}:** {value}\n"
-                                response += "\n"
+                            for _, row in matches.head(MAX_ROWS).iterrows():
+                                response.fields(row)
+                                response.line()
+                            response.more(len(matches) - MAX_ROWS, "matching discs")
                             
-                            return response
+                            return response.build()
         
         return f"🛑 No disc found for '{disc_id}'. Maybe it's imaginary."
     
@@ -548,124 +672,122 @@ Just ask me naturally about your files or use the special commands!
                                   if 'autograph' in name.lower() or 'signature' in name.lower()]
                 
                 if autograph_sheets:
-                    response = f"✍️ **Autograph search results for '{query}':**\n\n"
+                    response = ResponseBuilder(f"✍️ **Autograph search results for '{query}':**\n\n")
                     found_matches = False
                     
                     for sheet_name in autograph_sheets:
                         sheet_data = file_data['sheets'][sheet_name]
                         df = sheet_data['data']
                         
-                        # Search in autograph sheet
-                        fuzzy_matches = []
-                        for _, row in df.iterrows():
-                            row_text = " ".join(map(str, row.fillna("")))
-                            score = fuzz.partial_ratio(query.lower(), row_text.lower())
-                            if score >= 75:
-                                fuzzy_matches.append((score, row))
+                        # Search in autograph sheet with the autograph scorer and cutoff
+                        fuzzy_matches = self.file_processor.fuzzy_match_rows(query, sheet_data,
+                                                                             search_config('autograph'))
                         
                         if fuzzy_matches:
                             found_matches = True
-                            fuzzy_matches.sort(reverse=True, key=lambda x: x[0])
                             
-                            response += f"**Sheet: {sheet_name}**\n"
+                            response.line(f"**Sheet: {sheet_name}**")
                             
-                            for score, row in fuzzy_matches[:5]:  # Top 5 matches
-                                response += f"- Match ({score}%):\n"
-                                for key, value in row.items():
-                                    response += f"  - **{key}:** {value}\n"
-                                response += "\n"
+                            for score, row_id in fuzzy_matches:
+                                response.line(f"- Match ({score}%):")
+                                response.fields(df.iloc[row_id], indent="  ")
+                                response.line()
                     
                     if not found_matches:
-                        response += "🫠 No autographs found. Maybe they bailed on the signing table."
+                        response.add("🫠 No autographs found. Maybe they bailed on the signing table.")
                     
-                    return response
+                    return response.build()
                 else:
                     # Search in all sheets if no autograph-specific sheet found
                     results = self.file_processor.search_in_file(query, file_data)
                     if results:
-                        response = f"✍️ **Autograph search results for '{query}' (searched all sheets):**\n\n"
+                        response = ResponseBuilder(f"✍️ **Autograph search results for '{query}' (searched all sheets):**\n\n")
                         
                         for result in results:
                             if result['type'] == 'fuzzy_match' and result['matches']:
-                                response += f"**Sheet: {result['sheet']}**\n"
+                                response.line(f"**Sheet: {result['sheet']}**")
                                 for score, match_data in result['matches'][:3]:
-                                    response += f"- Match ({score}%):\n"
-                                    for key, value in match_data.items():
-                                        response += f"  - **{key}:** {value}\n"
-                                    response += "\n"
+                                    response.line(f"- Match ({score}%):")
+                                    response.fields(match_data, indent="  ")
+                                    response.line()
                         
-                        return response
+                        return response.build()
         
         return f"🫠 No autographs found for '{query}'. Maybe they're dodging fans."
     
     def _handle_search_command(self, intent: Dict[str, Any], uploaded_files: Dict[str, Any]) -> str:
         """Handle search command with enhanced fuzzy search"""
+        return "".join(self._iter_search_command(intent, uploaded_files))
+    
+    def _iter_search_command(self, intent: Dict[str, Any], uploaded_files: Dict[str, Any]) -> Iterator[str]:
+        """Yield the search command response one file at a time"""
         query = intent['target']['value']
         
-        response = f"🔍 **Enhanced search results for: {query}**\n\n"
+        yield f"🔍 **Enhanced search results for: {query}**\n\n"
         found_results = False
         
-        for filename, file_data in uploaded_files.items():
-            results = self.file_processor.search_in_file(query, file_data)
-            
+        for filename, results in self._search_files(query, uploaded_files):
             if results:
                 found_results = True
-                response += f"**{filename}:**\n"
+                response = ResponseBuilder(f"**{filename}:**\n")
                 
                 for result in results:
-                    response += f"- {result['description']}\n"
+                    response.line(f"- {result['description']}")
                     
                     if result['type'] == 'fuzzy_match':
-                        for score, match_data in result['matches'][:10]:
-                            response += f"  - Match ({score}%):\n"
-                            for key, value in match_data.items():
-                                response += f"    - **{key}:** {value}\n"
-                            response += "\n"
+                        for score, match_data in result['matches'][:MAX_ROWS]:
+                            response.line(f"  - Match ({score}%):")
+                            response.fields(match_data, indent="    ")
+                            response.line()
+                        response.more(len(result['matches']) - MAX_ROWS, "matches", indent="  ")
                     
                     elif result['type'] == 'fuzzy_text_match':
-                        for match in result['matches'][:10]:
-                            response += f"  - Line {match['line_number']} ({match['score']}%): {match['content']}\n"
+                        for match in result['matches'][:MAX_ROWS]:
+                            response.line(f"  - Line {match['line_number']} ({match['score']}%): {truncate(match['content'])}")
+                        response.more(len(result['matches']) - MAX_ROWS, "lines", indent="  ")
                 
-                response += "\n"
+                response.line()
+                yield response.build()
         
         if not found_results:
-            response += "🫠 Zero matches. Maybe spellcheck is your friend."
-        
-        return response
+            yield "🫠 Zero matches. Maybe spellcheck is your friend."
     
     def _handle_count_command(self, intent: Dict[str, Any], uploaded_files: Dict[str, Any]) -> str:
         """Handle count command for keyword occurrences"""
+        return "".join(self._iter_count_command(intent, uploaded_files))
+    
+    def _iter_count_command(self, intent: Dict[str, Any], uploaded_files: Dict[str, Any]) -> Iterator[str]:
+        """Yield keyword counts one file at a time, then the total"""
         keyword = intent['target']['value']
         
-        response = f"📦 **Count results for '{keyword}':**\n\n"
+        yield f"📦 **Count results for '{keyword}':**\n\n"
         total_count = 0
         
-        for filename, file_data in uploaded_files.items():
-            file_count = 0
-            
-            if file_data['type'] == 'excel':
-                for sheet_name, sheet_data in file_data['sheets'].items():
-                    df = sheet_data['data']
-                    
-                    # Count in each column
-                    for col in df.columns:
-                        col_count = df[col].astype(str).str.lower().str.contains(keyword.lower(), na=False).sum()
-                        file_count += col_count
-            
-            elif file_data['type'] == 'text':
-                content = file_data['content'].lower()
-                file_count = content.count(keyword.lower())
+        counts = self.query_executor.map_files(lambda file_data: [self._count_in_file(keyword, file_data)], uploaded_files)
+        
+        for filename, sheet_counts in counts:
+            file_count = sum(sheet_counts)
             
             if file_count > 0:
-                response += f"**{filename}:** {file_count} occurrences\n"
+                yield f"**{filename}:** {file_count} occurrences\n"
                 total_count += file_count
         
-        response += f"\n**Total:** '{keyword}' appears {total_count} times across all files."
+        response = ResponseBuilder(f"\n**Total:** '{keyword}' appears {total_count} times across all files.")
         
         if total_count > 0:
-            response += " That's probably more than your monthly cardio."
+            response.add(" That's probably more than your monthly cardio.")
         
-        return response
+        yield response.build()
+    
+    def _count_in_file(self, keyword: str, file_data: Dict[str, Any]) -> int:
+        """Count keyword occurrences in every sheet or the text of one file"""
+        return self.file_processor.count_matches(keyword, file_data)
+    
+    def _search_files(self, query: str, uploaded_files: Dict[str, Any]) -> Iterator:
+        """Start search_in_file on every file and sheet; yields (filename, results) in upload order"""
+        return self.query_executor.map_files(
+            lambda file_data: self.file_processor.search_in_file(query, file_data), uploaded_files
+        )
     
     def _handle_login_command(self, intent: Dict[str, Any], uploaded_files: Dict[str, Any]) -> str:
         """Handle login command to get credentials"""
@@ -683,9 +805,9 @@ Just ask me naturally about your files or use the special commands!
         
         clouds = self.loginbot.list_clouds_starting(prefix)
         if clouds:
-            response = f"📡 **Aliases matching '{prefix}':**\n\n"
+            response = ResponseBuilder(f"📡 **Aliases matching '{prefix}':**\n\n")
             for cloud in clouds:
-                response += f"• {cloud}\n"
-            return response
+                response.line(f"• {cloud}")
+            return response.build()
         else:
             return f"📡 No aliases found starting with '{prefix}'. Try a broader prefix or upload a credentials file."
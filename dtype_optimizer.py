@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+from typing import Dict, Any, Tuple
+
+# Arrow-backed strings are only used when pyarrow is installed
+try:
+    import pyarrow  # noqa: F401
+    ARROW_STRING_DTYPE = pd.StringDtype("pyarrow")
+except ImportError:
+    ARROW_STRING_DTYPE = None
+
+# Share of unique values below which a text column becomes a category
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def optimize_dataframe(df: pd.DataFrame, parse_dates: bool = True) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Shrink the in-memory footprint of a freshly read sheet
+
+    Low-cardinality text becomes `category`, date columns whose every
+    value parses become `datetime64`, integers are downcast, floats only
+    when float32 holds every value exactly, and the remaining text is
+    stored as Arrow-backed strings when pyarrow is available.
+
+    Args:
+        df: DataFrame as returned by read_excel
+        parse_dates: Convert date-like text columns to datetime64
+
+    Returns:
+        Tuple of (optimized DataFrame, memory report)
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    optimized = df.copy()
+    converted = {}
+
+    for col in optimized.columns:
+        series = optimized[col]
+        new_series = _optimize_series(series, str(col), parse_dates)
+        if new_series is not None and new_series.dtype != series.dtype:
+            optimized[col] = new_series
+            converted[col] = str(new_series.dtype)
+
+    memory_after = int(optimized.memory_usage(deep=True).sum())
+
+    return optimized, {
+        'memory_before': memory_before,
+        'memory_after': memory_after,
+        'memory_saved': memory_before - memory_after,
+        'converted_columns': converted
+    }
+
+
+def _optimize_series(series: pd.Series, name: str, parse_dates: bool):
+    """Return a compact version of a column, or None to keep it as is"""
+    if pd.api.types.is_bool_dtype(series):
+        return None
+
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+
+    if pd.api.types.is_float_dtype(series):
+        downcast = pd.to_numeric(series, downcast='float')
+        # float32 would show 7.7 as 7.699999809265137
+        if np.array_equal(downcast.to_numpy(dtype=series.dtype), series.to_numpy(), equal_nan=True):
+            return downcast
+        return None
+
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return None
+
+    non_null = series.dropna()
+    if non_null.empty:
+        return None
+
+    # Mixed object columns (numbers and text) are left alone
+    if not non_null.map(type).eq(str).all():
+        return None
+
+    if parse_dates and 'date' in name.lower():
+        parsed = _parse_dates(series, non_null)
+        if parsed is not None:
+            return parsed
+
+    if non_null.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(non_null):
+        return series.astype('category')
+
+    if ARROW_STRING_DTYPE is not None:
+        return series.astype(ARROW_STRING_DTYPE)
+
+    return None
+
+
+def _parse_dates(series: pd.Series, non_null: pd.Series):
+    """The column as datetime64 when every value parses, else None so no cell like 'TBD' is lost"""
+    # One format guessed from the first value parses fast; mixed formats fall back to per-value parsing
+    date_format = guess_datetime_format(non_null.iloc[0]) or 'mixed'
+    parsed = pd.to_datetime(series, format=date_format, errors='coerce')
+    if parsed.notna().sum() < len(non_null) and date_format != 'mixed':
+        parsed = pd.to_datetime(series, format='mixed', errors='coerce')
+    return parsed if parsed.notna().sum() == len(non_null) else None
+
+
+def format_bytes(num_bytes: int) -> str:
+    """Format a byte count for display"""
+    size = float(num_bytes)
+    for unit in ['B', 'KB', 'MB']:
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
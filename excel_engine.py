@@ -0,0 +1,203 @@
+import datetime
+import os
+from itertools import islice
+import pandas as pd
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+from openpyxl import load_workbook
+
+# The Rust calamine reader is only used when python-calamine is installed
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+# 'auto' picks calamine when available, otherwise openpyxl in read-only streaming mode
+ENGINES = ('auto', 'calamine', 'openpyxl', 'pandas')
+DEFAULT_ENGINE = os.environ.get('MARK_EXCEL_ENGINE', 'auto')
+# Rows per chunk when streaming a sheet
+CHUNK_SIZE = 5000
+
+
+def calamine_available() -> bool:
+    return python_calamine is not None
+
+
+def resolve_engine(engine: str = DEFAULT_ENGINE, filename: str = '') -> str:
+    """Pick the concrete reader for a workbook; legacy .xls always goes through pandas"""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown Excel engine '{engine}'. Use one of: {', '.join(ENGINES)}")
+    if filename.lower().endswith('.xls') and engine != 'calamine':
+        return 'pandas'
+    if engine == 'auto':
+        return 'calamine' if calamine_available() else 'openpyxl'
+    if engine == 'calamine' and not calamine_available():
+        raise ValueError("The calamine engine needs python-calamine installed")
+    return engine
+
+
+def column_names(header: Tuple[Any, ...]) -> List[str]:
+    """Header cells as column names, with read_excel's 'Unnamed: n' and '.1' duplicate rules"""
+    names, seen = [], {}
+    for position, value in enumerate(header):
+        name = f"Unnamed: {position}" if value is None or value == '' else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def data_width(header: Tuple[Any, ...], rows: Iterable[Tuple[Any, ...]]) -> int:
+    """
+    Number of columns to keep, like read_excel: trailing columns go only when
+    neither the header nor any row has a value in them
+
+    rows is only read when the header ends in blank cells.
+    """
+    width = len(header)
+    named = width
+    while named and (header[named - 1] is None or header[named - 1] == ''):
+        named -= 1
+    for row in rows if named < width else ():
+        for position in range(min(len(row), width) - 1, named - 1, -1):
+            if row[position] is not None:
+                named = position + 1
+                break
+        if named == width:
+            break
+    return named
+
+
+def _is_blank(row: Tuple[Any, ...]) -> bool:
+    return all(value is None for value in row)
+
+
+def _plain_cell(value: Any) -> Any:
+    """Cell value as something sqlite3 stores without adapters"""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return str(value)
+    return value
+
+
+def _calamine_cell(value: Any) -> Any:
+    """Calamine cell as openpyxl returns it: blanks as None, whole numbers as int, dates as datetime"""
+    if value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return datetime.datetime.combine(value, datetime.time())
+    return value
+
+
+class ExcelWorkbook:
+    """An open workbook that reads sheets as DataFrames or streams them in row chunks"""
+
+    def __init__(self, source, engine: str = DEFAULT_ENGINE):
+        self.source = source
+        self.engine = resolve_engine(engine, getattr(source, 'name', str(source)))
+        self._openpyxl = None
+        self._calamine = None
+        self._pandas = None
+
+        if self.engine == 'openpyxl':
+            self._openpyxl = load_workbook(source, read_only=True, data_only=True)
+            self.sheet_names = self._openpyxl.sheetnames
+        elif self.engine == 'calamine':
+            if isinstance(source, (str, os.PathLike)):
+                self._calamine = python_calamine.CalamineWorkbook.from_path(str(source))
+            else:
+                self._calamine = python_calamine.CalamineWorkbook.from_filelike(source)
+            self.sheet_names = self._calamine.sheet_names
+        else:
+            self._pandas = pd.ExcelFile(source)
+            self.sheet_names = self._pandas.sheet_names
+
+    def _sheet_name(self, sheet_name) -> str:
+        return self.sheet_names[sheet_name] if isinstance(sheet_name, int) else sheet_name
+
+    def iter_rows(self, sheet_name=0) -> Iterator[Tuple[Any, ...]]:
+        """Every row of a sheet as a tuple of cell values, header included"""
+        name = self._sheet_name(sheet_name)
+        if self.engine == 'openpyxl':
+            yield from self._openpyxl[name].iter_rows(values_only=True)
+        elif self.engine == 'calamine':
+            sheet = self._calamine.get_sheet_by_name(name)
+            rows = sheet.iter_rows() if hasattr(sheet, 'iter_rows') else sheet.to_python()
+            for row in rows:
+                yield tuple(_calamine_cell(value) for value in row)
+        else:
+            df = self._pandas.parse(name, header=None)
+            yield from df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+    def iter_chunks(self, sheet_name=0, chunk_size: int = CHUNK_SIZE) -> Tuple[List[str], Iterator[List[Tuple[Any, ...]]]]:
+        """
+        Stream a sheet without materializing it
+
+        Returns:
+            (column names, iterator over lists of at most chunk_size row
+            tuples); blank rows inside the sheet are kept as all-None rows,
+            trailing ones are dropped, and dates come back as text
+        """
+        rows = self.iter_rows(sheet_name)
+        header = next(rows, ())
+        # Read-only sheets can report trailing empty columns; telling them from
+        # an unnamed column with data takes one extra pass, only when the header ends blank
+        width = data_width(header, islice(self.iter_rows(sheet_name), 1, None))
+        columns = column_names(header[:width])
+
+        def chunks() -> Iterator[List[Tuple[Any, ...]]]:
+            chunk, blank = [], 0
+            for row in rows:
+                row = tuple(_plain_cell(value) for value in row[:width])
+                if _is_blank(row):
+                    # Held back until a later row shows the blank run is not at the end
+                    blank += 1
+                    continue
+                for row in [(None,) * width] * blank + [row + (None,) * (width - len(row))]:
+                    chunk.append(row)
+                    if len(chunk) == chunk_size:
+                        yield chunk
+                        chunk = []
+                blank = 0
+            if chunk:
+                yield chunk
+
+        return columns, chunks()
+
+    def read_sheet(self, sheet_name=0) -> pd.DataFrame:
+        """Read one sheet into a DataFrame, typed like read_excel"""
+        name = self._sheet_name(sheet_name)
+        if self._pandas is not None:
+            return self._pandas.parse(name)
+
+        # openpyxl and calamine both build the frame from the already open workbook's rows
+        rows = self.iter_rows(name)
+        header = next(rows, ())
+        records = list(rows)
+        width = data_width(header, records)
+        records = [row[:width] for row in records]
+        # read_excel keeps blank rows inside the sheet, so row numbers still match it, and drops trailing ones
+        while records and _is_blank(records[-1]):
+            records.pop()
+        df = pd.DataFrame.from_records(records, columns=column_names(header[:width]), coerce_float=True)
+        # read_excel types a column with no values at all as float NaN, not object None
+        empty = [column for column in df.columns if df[column].dtype == object and df[column].isna().all()]
+        return df.astype({column: float for column in empty}) if empty else df
+
+    def close(self) -> None:
+        if self._openpyxl is not None:
+            self._openpyxl.close()
+        if self._pandas is not None:
+            self._pandas.close()
+
+
+def read_excel_sheet(source, sheet_name=0, engine: str = DEFAULT_ENGINE) -> pd.DataFrame:
+    """Drop-in for pd.read_excel(source, sheet_name=...) through the configured engine"""
+    workbook = ExcelWorkbook(source, engine)
+    try:
+        return workbook.read_sheet(sheet_name)
+    finally:
+        workbook.close()
@@ -1,8 +1,16 @@
 import pandas as pd
 import io
 import re
-from typing import Dict, Any, List, Union
-from rapidfuzz import fuzz
+from typing import Dict, Any, List, Union, Callable, Optional
+from dtype_optimizer import optimize_dataframe
+from summary_stats import summarize_dataframe
+from tokenizer import TOKEN_PATTERN, top_tokens, word_stats
+from row_index import RowAddressIndex
+from excel_engine import ExcelWorkbook
+from search_index import (TrigramIndex, column_texts, join_rows, fuzzy_search, fuzzy_best, build_key_index,
+                          is_text_column, text_row_texts, search_haystack, split_column_query)
+from text_normalize import normalize_text
+from search_config import SearchConfig, search_config
 
 class FileProcessor:
     """Handles processing of uploaded Excel and text files"""
@@ -10,12 +18,14 @@ class FileProcessor:
     def __init__(self):
         self.supported_formats = ['.xlsx', '.xls', '.txt']
     
-    def process_file(self, uploaded_file) -> Dict[str, Any]:
+    def process_file(self, uploaded_file, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
         """
         Process an uploaded file and return structured data
         
         Args:
             uploaded_file: Streamlit uploaded file object
+            progress_callback: Optional callable receiving (completed, total, label)
+                as each sheet finishes
             
         Returns:
             Dictionary containing processed file data
@@ -28,9 +38,12 @@ class FileProcessor:
         
         try:
             if file_extension in ['.xlsx', '.xls']:
-                return self._process_excel_file(uploaded_file)
+                return self._process_excel_file(uploaded_file, progress_callback)
             elif file_extension == '.txt':
-                return self._process_text_file(uploaded_file)
+                processed_data = self._process_text_file(uploaded_file)
+                if progress_callback:
+                    progress_callback(1, 1, filename)
+                return processed_data
         except Exception as e:
             raise Exception(f"Error processing file: {str(e)}")
     
@@ -38,11 +51,12 @@ class FileProcessor:
         """Extract file extension from filename"""
         return '.' + filename.split('.')[-1].lower()
     
-    def _process_excel_file(self, uploaded_file) -> Dict[str, Any]:
+    def _process_excel_file(self, uploaded_file, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
         """Process Excel file and return structured data"""
         try:
-            # Read Excel file
-            excel_data = pd.read_excel(uploaded_file, sheet_name=None)
+            # Open the workbook once and parse it sheet by sheet so progress can be reported
+            excel_file = ExcelWorkbook(uploaded_file)
+            sheet_names = excel_file.sheet_names
             
             processed_data = {
                 'type': 'excel',
@@ -51,7 +65,15 @@ class FileProcessor:
                 'summary': {}
             }
             
-            for sheet_name, df in excel_data.items():
+            for index, sheet_name in enumerate(sheet_names, 1):
+                if progress_callback:
+                    progress_callback(index - 1, len(sheet_names), sheet_name)
+                
+                df = excel_file.read_sheet(sheet_name)
+                
+                # Shrink dtypes before anything else keeps a reference to the sheet
+                df, memory_report = optimize_dataframe(df)
+                
                 # Convert DataFrame to dictionary for easier querying
                 sheet_data = {
                     'data': df,
@@ -59,11 +81,17 @@ class FileProcessor:
                     'columns': df.columns.tolist(),
                     'dtypes': df.dtypes.to_dict(),
                     'sample_data': df.head().to_dict('records'),
-                    'summary_stats': self._get_dataframe_summary(df)
+                    'memory': memory_report
                 }
+                self._build_search_index(sheet_data)
                 processed_data['sheets'][sheet_name] = sheet_data
+                
+                if progress_callback:
+                    progress_callback(index, len(sheet_names), sheet_name)
             
+            excel_file.close()
             processed_data['summary'] = self._create_excel_summary(processed_data['sheets'])
+            processed_data['row_index'] = RowAddressIndex.for_file(uploaded_file.name, processed_data)
             
             return processed_data
             
@@ -75,38 +103,121 @@ class FileProcessor:
         try:
             # Read text content
             content = uploaded_file.read().decode('utf-8')
+            lines = content.split('\n')
+            summary = self._create_text_summary(content)
             
             processed_data = {
                 'type': 'text',
                 'filename': uploaded_file.name,
                 'content': content,
-                'lines': content.split('\n'),
-                'word_count': len(content.split()),
-                'line_count': len(content.split('\n')),
+                'lines': lines,
+                'word_count': summary['word_count'],
+                'line_count': len(lines),
                 'char_count': len(content),
-                'summary': self._create_text_summary(content)
+                'summary': summary,
+                'index': self._build_text_index(lines)
             }
+            processed_data['row_index'] = RowAddressIndex.for_file(uploaded_file.name, processed_data)
             
             return processed_data
             
         except Exception as e:
             raise Exception(f"Failed to process text file: {str(e)}")
     
-    def _get_dataframe_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate summary statistics for a DataFrame"""
-        summary = {
-            'row_count': len(df),
-            'column_count': len(df.columns),
-            'null_values': df.isnull().sum().to_dict(),
-            'data_types': df.dtypes.astype(str).to_dict()
+    def _build_text_index(self, lines: List[str]) -> Dict[str, Any]:
+        """Build normalized lines, line offsets and a token -> line ids map once per upload"""
+        search_lines = [normalize_text(line) for line in lines]
+        line_offsets = []
+        tokens = {}
+        offset = 0
+        
+        for line_id, line in enumerate(lines):
+            line_offsets.append(offset)
+            offset += len(line) + 1
+            for token in set(TOKEN_PATTERN.findall(search_lines[line_id])):
+                tokens.setdefault(token, []).append(line_id)
+        
+        return {
+            'search_lines': search_lines,
+            'line_offsets': line_offsets,
+            'tokens': tokens
         }
+    
+    def get_text_line(self, file_data: Dict[str, Any], line_number: int) -> Union[str, None]:
+        """Return a 1-based line of a text file using the precomputed offsets"""
+        offsets = file_data['index']['line_offsets']
+        if line_number < 1 or line_number > len(offsets):
+            return None
+        
+        start = offsets[line_number - 1]
+        end = offsets[line_number] - 1 if line_number < len(offsets) else len(file_data['content'])
+        return file_data['content'][start:end]
+    
+    def _build_search_index(self, sheet_data: Dict[str, Any]) -> None:
+        """Precompute normalized column and row texts, text-column flags, the trigram index (postings built on first use) and the exact cell-value index"""
+        df = sheet_data['data']
+        columns = column_texts(df)
+        texts = join_rows(columns, len(df))
+        sheet_data['column_texts'] = columns
+        sheet_data['column_keys'] = [normalize_text(col) for col in df.columns]
+        sheet_data['text_columns'] = [is_text_column(column) for column in columns]
+        sheet_data['text_row_texts'] = text_row_texts(columns, sheet_data['text_columns'], len(df))
+        sheet_data['row_texts'] = texts
+        sheet_data['trigram_index'] = TrigramIndex(texts)
+        sheet_data['key_index'] = build_key_index(columns)
+    
+    def fuzzy_match_rows(self, query: str, sheet_data: Dict[str, Any],
+                         config: Optional[SearchConfig] = None) -> List[tuple]:
+        """
+        Return (score, row id) pairs for rows of a sheet matching the query
         
-        # Add numeric summary if there are numeric columns
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) > 0:
-            summary['numeric_summary'] = df[numeric_cols].describe().to_dict()
+        `[Column] text` or `column=text` scores one column; other queries
+        skip numeric and ID columns unless they contain digits. Scorer, cutoff
+        and limit come from config, by default the 'search' configuration.
+        """
+        if 'text_columns' not in sheet_data:
+            self._build_search_index(sheet_data)
+        texts, query_text = search_haystack(query, sheet_data['row_texts'], sheet_data['column_texts'],
+                                            sheet_data['columns'], sheet_data['text_row_texts'])
+        if texts is None:
+            return []
+        return fuzzy_search(query_text, texts, sheet_data['trigram_index'], config or search_config('search'))
+    
+    def first_match(self, query: str, file_data: Dict[str, Any]) -> Union[tuple, None]:
+        """
+        Find the first matching row of an Excel file without ranking every match
+        
+        Sheets are tried in order. An exact cell-value hit wins outright;
+        otherwise the best fuzzy row is taken, stopping at the first perfect score.
+        
+        Returns:
+            (sheet name, score, row id) or None
+        """
+        key = normalize_text(query)
+        
+        for sheet_name, sheet_data in file_data['sheets'].items():
+            if 'text_columns' not in sheet_data:
+                self._build_search_index(sheet_data)
+            
+            row_id = sheet_data['key_index'].get(key)
+            if row_id is not None:
+                return sheet_name, 100.0, row_id
+            
+            best = fuzzy_best(key, sheet_data['row_texts'], sheet_data['trigram_index'], search_config('first_disc'))
+            if best is not None:
+                return sheet_name, best[0], best[1]
         
-        return summary
+        return None
+    
+    def get_sheet_summary(self, sheet_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Summary statistics for a sheet, computed on first request and cached
+        
+        Large sheets get an approximate summary; see summary_stats.summarize_dataframe.
+        """
+        if 'summary_stats' not in sheet_data:
+            sheet_data['summary_stats'] = summarize_dataframe(sheet_data['data'])
+        return sheet_data['summary_stats']
     
     def _create_excel_summary(self, sheets: Dict[str, Any]) -> Dict[str, Any]:
         """Create overall summary for Excel file"""
@@ -118,32 +229,65 @@ class FileProcessor:
             'sheet_names': list(sheets.keys()),
             'total_rows': total_rows,
             'total_columns': total_columns,
-            'sheet_summaries': {name: sheet['summary_stats'] for name, sheet in sheets.items()}
+            'memory_saved': sum(sheet['memory']['memory_saved'] for sheet in sheets.values()),
+            'sheet_memory': {name: sheet['memory'] for name, sheet in sheets.items()}
         }
     
     def _create_text_summary(self, content: str) -> Dict[str, Any]:
         """Create summary for text content"""
-        words = content.split()
+        word_count, word_chars = word_stats(content)
         sentences = re.split(r'[.!?]+', content)
         
-        # Find most common words (basic implementation)
-        word_freq = {}
-        for word in words:
-            word_clean = re.sub(r'[^\w]', '', word.lower())
-            if word_clean and len(word_clean) > 3:  # Ignore short words
-                word_freq[word_clean] = word_freq.get(word_clean, 0) + 1
-        
-        # Get top 10 most common words
-        top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-        
         return {
-            'word_count': len(words),
+            'word_count': word_count,
             'sentence_count': len([s for s in sentences if s.strip()]),
             'paragraph_count': len([p for p in content.split('\n\n') if p.strip()]),
-            'average_word_length': sum(len(word) for word in words) / len(words) if words else 0,
-            'top_words': top_words
+            'average_word_length': word_chars / word_count if word_count else 0,
+            # Top 10 words of four or more letters, counted in one streaming pass
+            'top_words': top_tokens(content)
         }
     
+    def count_matches(self, keyword: str, file_data: Dict[str, Any]) -> int:
+        """
+        Count cells (Excel) or occurrences (text) containing a keyword
+        
+        Matching runs on the normalized text stored at upload, so only the
+        keyword is normalized per request.
+        """
+        keyword = normalize_text(keyword)
+        
+        if file_data['type'] == 'excel':
+            count = 0
+            for sheet_data in file_data['sheets'].values():
+                if 'text_columns' not in sheet_data:
+                    self._build_search_index(sheet_data)
+                for texts in sheet_data['column_texts']:
+                    count += sum(1 for text in texts if keyword in text)
+            return count
+        
+        if file_data['type'] == 'text':
+            index = file_data.get('index')
+            if not index or 'search_lines' not in index:
+                index = file_data['index'] = self._build_text_index(file_data['lines'])
+            return sum(line.count(keyword) for line in index['search_lines'])
+        
+        return 0
+    
+    def rows_containing(self, keyword: str, sheet_data: Dict[str, Any], columns: List[Any]) -> List[int]:
+        """
+        Row ids, in order, where any of the given columns contains the keyword
+        
+        Like count_matches, this reads the normalized column texts stored at
+        upload and only normalizes the keyword.
+        """
+        keyword = normalize_text(keyword)
+        if 'text_columns' not in sheet_data:
+            self._build_search_index(sheet_data)
+        
+        positions = [sheet_data['columns'].index(col) for col in columns]
+        column_texts = [sheet_data['column_texts'][position] for position in positions]
+        return [row_id for row_id, texts in enumerate(zip(*column_texts)) if any(keyword in text for text in texts)]
+    
     def search_in_file(self, query: str, file_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search for specific content in processed file data"""
         results = []
@@ -158,20 +302,23 @@ class FileProcessor:
     def _search_excel(self, query: str, file_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search for content in Excel file using fuzzy matching"""
         results = []
-        query_lower = query.lower()
+        column, _ = split_column_query(query)
+        query_text = normalize_text(query)
+        column_config = search_config('columns')
         
         for sheet_name, sheet_data in file_data['sheets'].items():
             df = sheet_data['data']
+            if 'text_columns' not in sheet_data:
+                self._build_search_index(sheet_data)
             
-            # Search in column names using fuzzy matching
-            matching_columns = []
-            for col in df.columns:
-                score = fuzz.partial_ratio(query_lower, str(col).lower())
-                if score >= 75:
-                    matching_columns.append((col, score))
+            # Search in column names using fuzzy matching, unless the query already names one
+            column_keys = sheet_data['column_keys'] if column is None else []
+            matching_columns = [(df.columns[position], score)
+                                for score, position in column_config.extract(query_text, column_keys)]
+            if column_config.limit is not None:
+                matching_columns = matching_columns[:column_config.limit]
             
             if matching_columns:
-                matching_columns.sort(key=lambda x: x[1], reverse=True)
                 results.append({
                     'type': 'column_match',
                     'sheet': sheet_name,
@@ -180,24 +327,16 @@ class FileProcessor:
                     'description': f"Found matching columns in sheet '{sheet_name}'"
                 })
             
-            # Search in cell values using fuzzy matching
-            fuzzy_matches = []
-            for _, row in df.iterrows():
-                row_text = " ".join(map(str, row.fillna("")))
-                score = fuzz.partial_ratio(query_lower, row_text.lower())
-                if score >= 75:
-                    fuzzy_matches.append((score, row))
-            
-            if fuzzy_matches:
-                # Sort by score and take top 10
-                fuzzy_matches.sort(reverse=True, key=lambda x: x[0])
-                top_matches = fuzzy_matches[:10]
-                
+            # Search in cell values using fuzzy matching (top matches by score)
+            top_matches = self.fuzzy_match_rows(query, sheet_data)
+            
+            if top_matches:
                 results.append({
                     'type': 'fuzzy_match',
                     'sheet': sheet_name,
-                    'matches': [(score, row.to_dict()) for score, row in top_matches],
-                    'description': f"Found {len(top_matches)} fuzzy matches in sheet '{sheet_name}'"
+                    'matches': [(score, df.iloc[row_id].to_dict()) for score, row_id in top_matches],
+                    'description': f"Found {len(top_matches)} fuzzy matches in "
+                                   f"{f'column {column} of ' if column else ''}sheet '{sheet_name}'"
                 })
         
         return results
@@ -205,24 +344,44 @@ class FileProcessor:
     def _search_text(self, query: str, file_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search for content in text file using fuzzy matching"""
         results = []
-        query_lower = query.lower()
+        query_text = normalize_text(query)
+        config = search_config('text')
+        limit = config.limit if config.limit is not None else len(file_data['lines'])
         lines = file_data['lines']
+        index = file_data.get('index')
+        if not index or 'search_lines' not in index:
+            index = file_data['index'] = self._build_text_index(lines)
         
-        # Search for query in content using fuzzy matching
-        matching_lines = []
-        for i, line in enumerate(lines):
-            score = fuzz.partial_ratio(query_lower, line.lower())
-            if score >= 75:
-                matching_lines.append({
-                    'line_number': i + 1,
-                    'content': line.strip(),
-                    'score': score
-                })
+        # Lines holding a single-word query exactly come from the inverted index and rank first;
+        # the fuzzy scan then fills the remaining places, so plurals and typos still match
+        token_lines = index['tokens'].get(query_text, []) if TOKEN_PATTERN.fullmatch(query_text) else []
+        if token_lines and config.partial:
+            # The word occurs in each of these lines, so partial_ratio scores them all 100
+            scored_lines = {line_id: 100.0 for line_id in token_lines[:limit]}
+        elif token_lines:
+            search_lines = index['search_lines']
+            scored_lines = {token_lines[position]: score for score, position
+                            in config.extract(query_text, [search_lines[line_id] for line_id in token_lines])}
+        else:
+            scored_lines = {}
+        exact_lines = set(scored_lines)
+        
+        if len(scored_lines) < limit:
+            # Fuzzy scoring runs in one batch over the lines normalized at upload
+            for score, line_id in config.extract(query_text, index['search_lines']):
+                if len(scored_lines) == limit:
+                    break
+                scored_lines.setdefault(line_id, score)
+        
+        matching_lines = [
+            {'line_number': line_id + 1, 'content': lines[line_id].strip(), 'score': score}
+            for line_id, score in scored_lines.items()
+        ]
         
         if matching_lines:
-            # Sort by score and take top 20
-            matching_lines.sort(key=lambda x: x['score'], reverse=True)
-            top_matches = matching_lines[:20]
+            # Exact-word lines first, then by score (then line order), and take the configured top lines
+            matching_lines.sort(key=lambda x: (x['line_number'] - 1 not in exact_lines, -x['score'], x['line_number']))
+            top_matches = matching_lines[:limit]
             
             results.append({
                 'type': 'fuzzy_text_match',
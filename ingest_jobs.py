@@ -0,0 +1,125 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from file_processor import FileProcessor
+
+
+class BufferedUpload(io.BytesIO):
+    """In-memory copy of an uploaded file that outlives the Streamlit rerun"""
+
+    def __init__(self, name: str, content: bytes):
+        super().__init__(content)
+        self.name = name
+
+
+class IngestJob:
+    """Progress and outcome of one file being processed in the background"""
+
+    def __init__(self, filename: str, upload_id: Optional[str] = None):
+        self.filename = filename
+        # Streamlit's file_id, which changes when the same name is uploaded again
+        self.upload_id = upload_id
+        self.status = 'queued'
+        self.completed = 0
+        self.total = 0
+        self.current = ''
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        """Share of sheets processed, between 0 and 1"""
+        if self.status == 'done':
+            return 1.0
+        return self.completed / self.total if self.total else 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def describe(self) -> str:
+        """Short status line for the sidebar"""
+        if self.status == 'queued':
+            return f"⏳ {self.filename}: waiting..."
+        if self.status == 'running':
+            return f"⚙️ {self.filename}: {self.completed}/{self.total or '?'} sheets {self.current}".rstrip()
+        if self.status == 'failed':
+            return f"❌ Error processing {self.filename}: {self.error}"
+        return f"✅ {self.filename} uploaded successfully!"
+
+
+class IngestJobRegistry:
+    """Runs file processing on a worker pool and tracks each upload as a job"""
+
+    def __init__(self, file_processor: FileProcessor, max_workers: int = 4):
+        self.file_processor = file_processor
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mark-ingest")
+        self._jobs: Dict[str, IngestJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, uploaded_file) -> IngestJob:
+        """Queue an uploaded file for processing and return its job"""
+        # Copy the bytes now: Streamlit may drop the upload buffer on the next rerun
+        upload = BufferedUpload(uploaded_file.name, uploaded_file.getvalue())
+        job = IngestJob(uploaded_file.name, getattr(uploaded_file, 'file_id', None))
+
+        with self._lock:
+            self._jobs[job.filename] = job
+
+        self.executor.submit(self._run, job, upload)
+        return job
+
+    def _run(self, job: IngestJob, upload: BufferedUpload) -> None:
+        """Worker body: process the file and record progress on the job"""
+        job.status = 'running'
+
+        def on_progress(completed: int, total: int, label: str) -> None:
+            job.completed = completed
+            job.total = total
+            job.current = f"({label})"
+
+        try:
+            job.result = self.file_processor.process_file(upload, progress_callback=on_progress)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+
+    def should_submit(self, uploaded_file) -> bool:
+        """
+        True for a file with no job yet, or a fresh upload of one whose last attempt failed
+
+        The failed job is dropped in that case, so its error stops showing.
+        """
+        with self._lock:
+            job = self._jobs.get(uploaded_file.name)
+            if job is None:
+                return True
+            upload_id = getattr(uploaded_file, 'file_id', None)
+            if job.status == 'failed' and upload_id is not None and upload_id != job.upload_id:
+                del self._jobs[uploaded_file.name]
+                return True
+            return False
+
+    def jobs(self) -> List[IngestJob]:
+        """All known jobs in submission order"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def has_active_jobs(self) -> bool:
+        return any(not job.finished for job in self.jobs())
+
+    def collect_finished(self) -> Dict[str, Dict[str, Any]]:
+        """Hand over results of completed jobs, each exactly once"""
+        collected = {}
+        for job in self.jobs():
+            if job.status == 'done' and job.result is not None:
+                collected[job.filename] = job.result
+                job.result = None
+        return collected
+
+    def forget(self, filename: str) -> None:
+        """Drop a job so the same filename can be uploaded again"""
+        with self._lock:
+            self._jobs.pop(filename, None)
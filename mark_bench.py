@@ -0,0 +1,325 @@
+import argparse
+import ctypes
+import gc
+import io
+import os
+import random
+import tempfile
+import re
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.append("pages")
+
+from chatbot import MarkBot
+from dtype_optimizer import optimize_dataframe
+from excel_engine import calamine_available, read_excel_sheet
+from file_processor import FileProcessor
+from query_executor import QueryExecutor
+from search_config import search_config
+from search_index import (TrigramIndex, column_texts, join_rows, is_text_column, text_row_texts, search_haystack,
+                          fuzzy_search)
+from tokenizer import top_tokens
+
+WORDS = ["matrix", "wrestling", "classic", "raw", "nitro", "house", "show", "tour", "special",
+         "tribute", "legends", "road", "warriors", "ladder", "match", "title"]
+
+
+class NamedBytes(io.BytesIO):
+    """In-memory upload with a file name, like Streamlit's UploadedFile"""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def workbook_bytes(sheets):
+    """Write {sheet name: DataFrame} to an .xlsx in memory with openpyxl's streaming writer"""
+    workbook = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def upload(df, name="bench.xlsx", sheet_name="Sheet1"):
+    """Process a DataFrame the way an uploaded workbook is processed"""
+    return FileProcessor().process_file(NamedBytes(workbook_bytes({sheet_name: df}), name))
+
+
+def wide_sheet(rows, text_columns=3, other_columns=40):
+    """A few text columns followed by many numeric and ID columns"""
+    rng = np.random.default_rng(0)
+    words = np.array(WORDS)
+    data = {}
+    for position in range(text_columns):
+        picked = rng.choice(words, size=(rows, 3))
+        data[f"Text {position}"] = [" ".join(values) for values in picked]
+    for position in range(other_columns):
+        if position % 3 == 0:
+            data[f"ID {position}"] = [f"ID{value:06d}" for value in rng.integers(0, 999_999, rows)]
+        else:
+            data[f"Number {position}"] = rng.normal(1000, 300, rows).round(2)
+    return pd.DataFrame(data)
+
+
+def long_text_sheet(rows, columns, cell_chars):
+    """Every cell a long run of words, like pasted notes"""
+    rng = random.Random(0)
+    return pd.DataFrame({
+        f"Notes {position}": [" ".join(rng.choices(WORDS, k=cell_chars // 7))[:cell_chars] for _ in range(rows)]
+        for position in range(columns)
+    })
+
+
+def catalog_sheet(rows):
+    """A DVD catalog shaped like the MASTER DVD sheet"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Disc #": [f"DVD{value:05d}" for value in range(1, rows + 1)],
+        "Title": [" ".join(values) for values in rng.choice(np.array(WORDS), size=(rows, 3))],
+        "Company": rng.choice(np.array(["WWE", "WCW", "ECW", "TNA", "ROH", "AJPW"]), rows),
+        "Year": rng.integers(1985, 2020, rows),
+        "Date": [f"{year}-{month:02d}-{day:02d}" for year, month, day in
+                 zip(rng.integers(1985, 2020, rows), rng.integers(1, 13, rows), rng.integers(1, 29, rows))],
+        "Price": rng.choice(np.array([4.99, 7.7, 9.99, 12.5, 19.95]), rows),
+    })
+
+
+def sample_text(megabytes):
+    """Synthetic prose with a skewed vocabulary, about the given size"""
+    vocabulary = [f"word{rank}" for rank in range(50_000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rng = random.Random(0)
+    sample = rng.choices(vocabulary, weights=weights, k=10_000)
+    average = sum(map(len, sample)) / len(sample) + 1
+    words = rng.choices(vocabulary, weights=weights, k=int(megabytes * 1024 * 1024 / average))
+    lines = [" ".join(words[i:i + 12]) + "." for i in range(0, len(words), 12)]
+    return "\n".join(lines)
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def _legacy_search_command(query, uploaded_files):
+    """search: as rendered before ResponseBuilder: every field, uncut, grown with +="""
+    processor = FileProcessor()
+    response = f"🔍 **Enhanced search results for: {query}**\n\n"
+    for filename, file_data in uploaded_files.items():
+        results = processor.search_in_file(query, file_data)
+        if results:
+            response += f"**{filename}:**\n"
+            for result in results:
+                response += f"- {result['description']}\n"
+                if result["type"] == "fuzzy_match":
+                    for score, match_data in result["matches"][:10]:
+                        response += f"  - Match ({score}%):\n"
+                        for key, value in match_data.items():
+                            response += f"    - **{key}:** {value}\n"
+                        response += "\n"
+            response += "\n"
+    return response
+
+
+def _legacy_top_words(text, n=10):
+    """The per-word re.sub, dict and full sort the tokenizer replaced"""
+    word_freq = {}
+    for word in text.split():
+        word_clean = re.sub(r"[^\w]", "", word.lower())
+        if word_clean and len(word_clean) > 3:
+            word_freq[word_clean] = word_freq.get(word_clean, 0) + 1
+    return sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:n]
+
+
+def _resident_mb():
+    """Current resident set size of this process (Linux)"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def _release_memory():
+    """Hand freed heap back to the OS so RSS reflects what is still held"""
+    gc.collect()
+    ctypes.CDLL("libc.so.6").malloc_trim(0)
+    try:
+        import pyarrow
+        pyarrow.default_memory_pool().release_unused()
+    except ImportError:
+        pass
+
+
+def bench_dtypes(args):
+    """Resident memory while a sheet is held as read and after optimize_dataframe"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.xlsx")
+        with open(path, "wb") as f:
+            f.write(workbook_bytes({"DVDs": catalog_sheet(args.rows)}))
+        _release_memory()
+        baseline = _resident_mb()
+        print(f"{args.rows} rows, {baseline:.1f} MB RSS before reading")
+
+        df = read_excel_sheet(path)
+        _release_memory()
+        print(f"      raw: frame {df.memory_usage(deep=True).sum() / 1024 / 1024:7.1f} MB  "
+              f"RSS +{_resident_mb() - baseline:6.1f} MB")
+        df, report = optimize_dataframe(df)
+        _release_memory()
+        print(f"optimized: frame {df.memory_usage(deep=True).sum() / 1024 / 1024:7.1f} MB  "
+              f"RSS +{_resident_mb() - baseline:6.1f} MB  {report['converted_columns']}")
+
+
+def bench_responses(args):
+    """Chat response time and markdown size on a wide and a tall sheet"""
+    sheets = {
+        f"wide ({args.wide_rows} rows × 80 long-text columns)": long_text_sheet(args.wide_rows, 80, 300),
+        f"tall ({args.tall_rows} rows × 6 columns)": catalog_sheet(args.tall_rows),
+    }
+    bot = MarkBot()
+    for label, df in sheets.items():
+        files = {"bench.xlsx": upload(df)}
+        print(label)
+        legacy, elapsed = _timed(_legacy_search_command, "matrix", files)
+        print(f"  {'legacy search:matrix':>22}: {elapsed * 1000:8.1f} ms  {len(legacy.encode()) / 1024:8.1f} KB")
+        for command in ("search:matrix", "row 5", "rows 1-500", "show me the data"):
+            response, elapsed = _timed(bot.generate_response, command, files)
+            print(f"  {command:>22}: {elapsed * 1000:8.1f} ms  {len(response.encode()) / 1024:8.1f} KB")
+
+
+def bench_excel(args):
+    """Time and peak traced Python memory of every available engine on one sheet"""
+    for engine in ("pandas", "openpyxl", "calamine"):
+        if engine == "calamine" and not calamine_available():
+            print(f"{engine:>9}: python-calamine not installed")
+            continue
+        tracemalloc.start()
+        df, elapsed = _timed(read_excel_sheet, args.workbook, args.sheet, engine)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{engine:>9}: {elapsed:6.2f}s  peak {peak / 1024 / 1024:7.1f} MB  {len(df)} rows")
+
+
+def bench_tokens(args):
+    """Top-words time of the legacy per-word loop and the streaming tokenizer"""
+    if args.text:
+        with open(args.text, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = sample_text(args.megabytes)
+    print(f"{len(text) / 1024 / 1024:.0f} MB of text")
+    for name, fn in (("legacy", _legacy_top_words), ("tokenizer", top_tokens)):
+        _, elapsed = _timed(fn, text)
+        print(f"{name:>9}: {elapsed:6.2f}s")
+
+
+def bench_executor(args):
+    """search: over several multi-sheet files, one sheet after another versus on the query pool"""
+    file_data = FileProcessor().process_file(NamedBytes(workbook_bytes(
+        {f"Sheet{sheet}": catalog_sheet(args.rows) for sheet in range(args.sheets)}), "bench.xlsx"))
+    files = {f"file{position}.xlsx": file_data for position in range(args.files)}
+    processor = FileProcessor()
+    search = lambda part: processor.search_in_file(args.query, part)
+    print(f"{args.files} files × {args.sheets} sheets × {args.rows} rows, {os.cpu_count()} CPUs")
+
+    _, sequential = _timed(lambda: [search(part) for part in files.values()])
+    _, pooled = _timed(lambda: list(QueryExecutor().map_files(search, files)))
+    print(f"sequential: {sequential * 1000:8.1f} ms")
+    print(f"    pooled: {pooled * 1000:8.1f} ms  ({sequential / pooled:.2f}×)")
+
+
+def bench_search(args):
+    """Fuzzy search with and without the trigram index on a catalog, checked against the full scan"""
+    df = catalog_sheet(args.rows)
+    texts = join_rows(column_texts(df), len(df))
+    index, elapsed = _timed(lambda: TrigramIndex(texts).build())
+    print(f"{args.rows} rows, index built in {elapsed:.2f}s")
+    for cutoff in args.cutoff:
+        config = search_config()._replace(cutoff=cutoff, limit=None)
+        for query in args.query:
+            full, full_elapsed = _timed(fuzzy_search, query, texts, None, config)
+            indexed, indexed_elapsed = _timed(fuzzy_search, query, texts, index, config)
+            candidates = index.candidates(query, cutoff)
+            scored = len(texts) if candidates is None else len(candidates)
+            print(f"cutoff {cutoff:>3} {query!r:>16}: full {full_elapsed * 1000:7.1f} ms  "
+                  f"indexed {indexed_elapsed * 1000:7.1f} ms  {scored:>7} rows scored  {len(full):>6} matches  "
+                  f"{'same' if indexed == full else 'DIFFERENT'}")
+
+
+def bench_columns(args):
+    """Scoring work of one query on a wide sheet: whole rows, text columns only, one named column"""
+    df = wide_sheet(args.rows, other_columns=args.other_columns)
+    columns = column_texts(df)
+    texts = join_rows(columns, len(df))
+    text_rows = text_row_texts(columns, [is_text_column(column) for column in columns], len(df))
+    index = TrigramIndex(texts)
+
+    for mode, search in (("whole rows", args.query), ("text columns", args.query), ("one column", f"[Text 0] {args.query}")):
+        haystack, query_text = search_haystack(search, texts, columns, df.columns,
+                                               text_rows if mode != "whole rows" else None)
+        characters = sum(map(len, haystack))
+        matches, elapsed = _timed(fuzzy_search, query_text, haystack, index, search_config()._replace(limit=None))
+        print(f"{mode:>12}: {characters / 1e6:7.2f}M chars scored  {elapsed * 1000:8.1f} ms  {len(matches)} matches")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for Mark's ingest, search and chat paths.")
+    commands = parser.add_subparsers(dest="bench", required=True)
+
+    dtypes = commands.add_parser("dtypes", help=bench_dtypes.__doc__)
+    dtypes.add_argument("--rows", type=int, default=100_000)
+    dtypes.set_defaults(run=bench_dtypes)
+
+    responses = commands.add_parser("responses", help=bench_responses.__doc__)
+    responses.add_argument("--wide-rows", type=int, default=2_000)
+    responses.add_argument("--tall-rows", type=int, default=100_000)
+    responses.set_defaults(run=bench_responses)
+
+    excel = commands.add_parser("excel", help=bench_excel.__doc__)
+    excel.add_argument("workbook")
+    excel.add_argument("sheet", nargs="?", default=0)
+    excel.set_defaults(run=bench_excel)
+
+    tokens = commands.add_parser("tokens", help=bench_tokens.__doc__)
+    tokens.add_argument("text", nargs="?", help="Text file to read; defaults to generated text")
+    tokens.add_argument("--megabytes", type=float, default=100)
+    tokens.set_defaults(run=bench_tokens)
+
+    executor = commands.add_parser("executor", help=bench_executor.__doc__)
+    executor.add_argument("--files", type=int, default=4)
+    executor.add_argument("--sheets", type=int, default=3)
+    executor.add_argument("--rows", type=int, default=20_000)
+    executor.add_argument("--query", default="ladder match")
+    executor.set_defaults(run=bench_executor)
+
+    search = commands.add_parser("search", help=bench_search.__doc__)
+    search.add_argument("--rows", type=int, default=100_000)
+    search.add_argument("--cutoff", type=float, action="append", help="Repeatable; defaults to 75, 90 and 95")
+    search.add_argument("--query", action="append", help="Repeatable; defaults to a mix of typos and titles")
+    search.set_defaults(run=bench_search)
+
+    wide = commands.add_parser("columns", help=bench_columns.__doc__)
+    wide.add_argument("--rows", type=int, default=20_000)
+    wide.add_argument("--other-columns", type=int, default=40)
+    wide.add_argument("--query", default="ladder match")
+    wide.set_defaults(run=bench_columns)
+
+    args = parser.parse_args(argv)
+    if args.bench == "search":
+        args.cutoff = args.cutoff or [75, 90, 95]
+        args.query = args.query or ["mtarix", "ladder match", "undertakr", "dvd04242"]
+    args.run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
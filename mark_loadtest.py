@@ -0,0 +1,89 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+# Mix of cheap lookups and heavier fuzzy searches, cycled through by every client
+DEFAULT_COMMANDS = [
+    "disc:1",
+    "search:matrix",
+    "count:wwe",
+    "first disc:undertaker",
+    "company:WWE",
+    "stats:year",
+    "find company:WWE limit:20",
+]
+
+
+def _request(base_url, command, chat):
+    """Send one request; returns (latency ms, server ms, ok)"""
+    if chat:
+        request = Request(f"{base_url}/chat", data=json.dumps({"query": command}).encode("utf-8"),
+                          headers={"Content-Type": "application/json"})
+    else:
+        request = Request(f"{base_url}/command?q={quote(command)}")
+
+    started = time.perf_counter()
+    try:
+        with urlopen(request, timeout=60) as response:
+            response.read()
+            timing = response.headers.get("Server-Timing", "")
+            ok = response.status == 200
+    except Exception:
+        return (time.perf_counter() - started) * 1000, None, False
+    latency = (time.perf_counter() - started) * 1000
+    server_ms = float(timing.split("dur=")[1]) if "dur=" in timing else None
+    return latency, server_ms, ok
+
+
+def _client(base_url, commands, requests_per_client, offset, chat):
+    return [
+        _request(base_url, commands[(offset + i) % len(commands)], chat)
+        for i in range(requests_per_client)
+    ]
+
+
+def _percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive mark_server with many concurrent clients.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("-c", "--clients", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("-n", "--requests", type=int, default=50, help="Requests per client")
+    parser.add_argument("--command", action="append", help="Command to send (repeatable); defaults to a mixed set")
+    parser.add_argument("--chat", action="store_true", help="Send the commands to /chat instead of /command")
+    args = parser.parse_args(argv)
+
+    commands = args.command or DEFAULT_COMMANDS
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        futures = [
+            executor.submit(_client, args.url.rstrip("/"), commands, args.requests, offset, args.chat)
+            for offset in range(args.clients)
+        ]
+        results = [result for future in futures for result in future.result()]
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _, ok in results if ok]
+    server_times = [server_ms for _, server_ms, ok in results if ok and server_ms is not None]
+    failures = sum(1 for _, _, ok in results if not ok)
+
+    print(f"📊 {len(results)} requests from {args.clients} clients in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.1f} req/s), {failures} failed")
+    if latencies:
+        print(f"⏱️ latency ms: p50 {_percentile(latencies, 0.5):.1f}  p95 {_percentile(latencies, 0.95):.1f}  "
+              f"p99 {_percentile(latencies, 0.99):.1f}  max {max(latencies):.1f}")
+    if server_times:
+        print(f"🧠 server ms: mean {statistics.mean(server_times):.1f}  p95 {_percentile(server_times, 0.95):.1f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
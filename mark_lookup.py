@@ -0,0 +1,54 @@
+import os
+import sqlite3
+from typing import Any, Dict, List
+from mark_query import ISO_DATE_COLUMN
+from catalog_schema import read_display_names, has_metadata
+
+# Catalog database built by mark_core.refresh_sql_from_excel
+DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mark_database.db")
+
+DISC_SQL = "SELECT * FROM mark_table WHERE disc_no = ?"
+DISC_LIKE_SQL = "SELECT * FROM mark_table WHERE disc_no LIKE ?"
+
+
+def _query_rows(conn: sqlite3.Connection, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+    cursor = conn.execute(sql, params)
+    display_names = read_display_names(conn)
+    columns = [display_names.get(description[0], description[0]) for description in cursor.description]
+    return [
+        {column: value for column, value in zip(columns, row) if column != ISO_DATE_COLUMN}
+        for row in cursor.fetchall()
+    ]
+
+
+def catalog_ready(db_path: str = DB_FILE) -> bool:
+    """True when the database exists and already has canonical columns"""
+    if not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        return has_metadata(conn)
+    finally:
+        conn.close()
+
+
+def disc_rows(disc_id: str, db_path: str = DB_FILE) -> List[Dict[str, Any]]:
+    """
+    Look up a disc with sqlite3 alone, so callers avoid the pandas import
+
+    Tries the exact disc number, then `DVD` plus the zero-padded number, then a
+    substring match.
+
+    Returns:
+        One dictionary per matching row, in table order
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = _query_rows(conn, DISC_SQL, [disc_id])
+        if not rows and disc_id.isdigit():
+            rows = _query_rows(conn, DISC_SQL, [f"DVD{disc_id.zfill(3)}"])
+        if not rows:
+            rows = _query_rows(conn, DISC_LIKE_SQL, [f"%{disc_id}%"])
+    finally:
+        conn.close()
+    return rows
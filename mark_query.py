@@ -0,0 +1,197 @@
+import re
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from catalog_schema import canonical_name, DATE_COLUMN
+
+# Normalized YYYY-MM-DD copy of Date written at ingest, used for ranges
+ISO_DATE_COLUMN = 'date_iso'
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+OPERATOR = r'>=|<=|!=|:|=|>|<'
+# `company:"World Wrestling"` is one token, as is a bare `"quoted term"`
+TOKEN_PATTERN = re.compile(rf'[\w#]+(?:{OPERATOR})"[^"]*"|"[^"]*"|\S+')
+FILTER_PATTERN = re.compile(rf'^([\w#]+)({OPERATOR})(.*)$')
+SQL_OPERATORS = {':': '=', '=': '=', '!=': '!=', '>=': '>=', '<=': '<=', '>': '>', '<': '<'}
+DATE_PART = r'\d{4}(?:-\d{2}(?:-\d{2})?)?'
+DATE_RANGE_PATTERN = re.compile(rf'^({DATE_PART})?\.\.({DATE_PART})?$')
+DATE_PATTERN = re.compile(rf'^{DATE_PART}$')
+
+
+class QueryError(ValueError):
+    """Raised when a find query cannot be parsed or refers to unknown columns"""
+
+
+def parse_query(text: str) -> Dict[str, Any]:
+    """
+    Parse a find query such as `company:WWE date>=2003-01-01 "undertaker" limit:20`
+
+    Returns:
+        Dictionary with 'filters' as (field, operator, value) tuples,
+        free-text 'terms' for fuzzy rescoring and the row 'limit'
+    """
+    parsed = {'filters': [], 'terms': [], 'limit': DEFAULT_LIMIT}
+
+    for token in TOKEN_PATTERN.findall(text.strip()):
+        if token.startswith('"'):
+            if token.strip('"'):
+                parsed['terms'].append(token.strip('"'))
+            continue
+
+        match = FILTER_PATTERN.match(token)
+        if not match:
+            parsed['terms'].append(token)
+            continue
+
+        field, operator, value = match.groups()
+        value = value.strip('"')
+        if not value:
+            raise QueryError(f"Missing value for '{field}'")
+
+        if field.lower() == 'limit':
+            if not value.isdigit():
+                raise QueryError(f"limit must be a number, got '{value}'")
+            parsed['limit'] = min(int(value), MAX_LIMIT)
+        else:
+            parsed['filters'].append((field, operator, value))
+
+    return parsed
+
+
+def is_date(value: str) -> bool:
+    """True for a single ISO year, month or day such as 2003, 2003-06 or 2003-06-30"""
+    return bool(DATE_PATTERN.match(value.strip()))
+
+
+def is_date_range(value: str) -> bool:
+    return bool(DATE_RANGE_PATTERN.match(value.strip()))
+
+
+def _next_period(value: str) -> str:
+    """Smallest ISO string after every date within a year, month or day"""
+    parts = value.split('-')
+    if len(parts) == 1:
+        return str(int(parts[0]) + 1)
+    if len(parts) == 2:
+        year, month = int(parts[0]), int(parts[1])
+        return f"{year + 1}-01" if month == 12 else f"{year}-{month + 1:02d}"
+    return (date.fromisoformat(value) + timedelta(days=1)).isoformat()
+
+
+def date_bounds(value: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Turn `2001..2005`, `2001-03..2001-06` or `..2003-01-15` into ISO bounds
+
+    Returns:
+        (inclusive start, exclusive end); either side may be None
+    """
+    match = DATE_RANGE_PATTERN.match(value.strip())
+    if not match or value.strip() == '..':
+        raise QueryError(f"Bad date range '{value}'. Use e.g. 2001..2005 or 2001-03-01..2001-06-30")
+    start, end = match.groups()
+    try:
+        return start, _next_period(end) if end else None
+    except ValueError:
+        raise QueryError(f"Bad date in range '{value}'")
+
+
+def date_range_clause(value: str, column: str = ISO_DATE_COLUMN) -> Tuple[str, List[str]]:
+    """SQL condition and parameters for a date range on the ISO date column"""
+    start, end = date_bounds(value)
+    clauses, params = [], []
+    if start:
+        clauses.append(f"{quote_identifier(column)} >= ?")
+        params.append(start)
+    if end:
+        clauses.append(f"{quote_identifier(column)} < ?")
+        params.append(end)
+    return " AND ".join(clauses), params
+
+
+def date_clause(value: str, column: str = ISO_DATE_COLUMN) -> Tuple[str, List[str]]:
+    """SQL condition for one year, month or day: the range covering it, since stored dates carry a time"""
+    value = value.strip()
+    try:
+        return date_range_clause(f"{value}..{value}", column)
+    except QueryError:
+        raise QueryError(f"Bad date '{value}'. Use e.g. 2003, 2003-06 or 2003-06-30")
+
+
+def date_comparison_clause(operator: str, value: str, column: str = ISO_DATE_COLUMN) -> Tuple[str, List[str]]:
+    """
+    SQL condition for `date>=2003`, `date<2001-06` and friends on the ISO date column
+
+    A year or month covers the whole period, like a range does: `date>2003`
+    starts in 2004 and `date<=2003-06` includes June 30.
+    """
+    value = value.strip()
+    if not DATE_PATTERN.match(value):
+        raise QueryError(f"Bad date '{value}'. Use e.g. 2003, 2003-06 or 2003-06-30")
+    try:
+        start, end = date_bounds(f"{value}..{value}")
+    except QueryError:
+        raise QueryError(f"Bad date '{value}'")
+    bound = {'>=': ('>=', start), '>': ('>=', end), '<': ('<', start), '<=': ('<', end)}
+    sql_operator, param = bound[operator]
+    return f"{quote_identifier(column)} {sql_operator} ?", [param]
+
+
+def resolve_column(field: str, columns: List[str]) -> str:
+    """Map a query field, short alias or original header to a canonical column name"""
+    wanted = canonical_name(field)
+    for column in columns:
+        if column == wanted or column.lower() == field.lower():
+            return column
+    raise QueryError(f"Unknown field '{field}'. Try one of: {', '.join(columns)}")
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def compile_query(parsed: Dict[str, Any], columns: List[str], table: str = 'mark_table') -> Tuple[str, List[Any]]:
+    """
+    Compile a parsed query into one parameterized SELECT
+
+    Equality filters compare case-insensitively so they can use the NOCASE
+    indexes built at refresh. Dates, date ranges and date comparisons run
+    on the ISO date column. With free-text terms the row limit is applied
+    after fuzzy rescoring, so the SQL returns every filtered row.
+    """
+    clauses = []
+    params: List[Any] = []
+
+    for field, operator, value in parsed['filters']:
+        column_name = resolve_column(field, columns)
+        date_range = operator == ':' and is_date_range(value)
+        single_date = operator in (':', '=') and is_date(value)
+        if column_name == DATE_COLUMN and (date_range or single_date or operator in ('>=', '<=', '>', '<')):
+            if ISO_DATE_COLUMN not in columns:
+                raise QueryError("Date ranges and comparisons need a refreshed database")
+            if date_range or single_date:
+                clause, date_params = date_range_clause(value) if date_range else date_clause(value)
+            else:
+                clause, date_params = date_comparison_clause(operator, value)
+            clauses.append(clause)
+            params.extend(date_params)
+            continue
+
+        column = quote_identifier(column_name)
+        sql_operator = SQL_OPERATORS[operator]
+        if sql_operator in ('=', '!='):
+            clauses.append(f"{column} {sql_operator} ? COLLATE NOCASE")
+        else:
+            clauses.append(f"{column} {sql_operator} ?")
+        params.append(value)
+
+    sql = f"SELECT rowid AS _rowid, * FROM {quote_identifier(table)}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY rowid"
+
+    if not parsed['terms']:
+        sql += " LIMIT ?"
+        params.append(parsed['limit'])
+
+    return sql, params
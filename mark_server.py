@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, "pages"))
+import mark_core
+from chatbot import MarkBot
+from ingest_jobs import BufferedUpload
+from loginbot import LoginBot
+from Mark import run_command, normalize_command, load_loginbot
+
+
+class MarkEngine:
+    """One warm set of MARK state shared by every request the server handles"""
+
+    def __init__(self, loginbot: LoginBot):
+        self.loginbot = loginbot
+        self.chatbot = MarkBot()
+        # Replaced, never mutated, so readers always see a consistent snapshot
+        self.uploaded_files = {}
+        self._files_lock = threading.Lock()
+
+    def warm(self) -> None:
+        """Build the database and the catalog search index before the first request"""
+        mark_core.ensure_db_ready()
+        mark_core.search_sql_data("warm up")
+        # Workbook edits are rebuilt and swapped in off the request path
+        mark_core.start_catalog_watcher()
+
+    def add_file(self, name: str, content: bytes) -> dict:
+        """Process a file for /chat queries, replacing any file with the same name"""
+        file_data = self.chatbot.file_processor.process_file(BufferedUpload(name, content))
+        with self._files_lock:
+            self.uploaded_files = {**self.uploaded_files, name: file_data}
+        return {"filename": name, "type": file_data.get("type"), "files": list(self.uploaded_files)}
+
+    def command(self, command: str) -> dict:
+        return run_command(normalize_command(command), self.loginbot)
+
+    def chat(self, query: str) -> dict:
+        return {"query": query, "response": self.chatbot.generate_response(query, self.uploaded_files)}
+
+
+class MarkRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints:
+
+        GET  /health
+        GET  /command?q=search:matrix    POST /command {"command": "..."}
+        POST /chat {"query": "..."}      answered against files loaded into the server
+        POST /files?name=LIST.xlsx       raw file bytes as the body
+    """
+
+    engine: MarkEngine = None
+    server_version = "MarkServer/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._timed(lambda: {"status": "ok", "files": list(self.engine.uploaded_files)})
+        elif url.path == "/command":
+            command = parse_qs(url.query).get("q", [""])[0]
+            self._timed(lambda: self._command(command))
+        else:
+            self._send(404, {"error": f"Unknown path {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if url.path == "/files":
+            name = parse_qs(url.query).get("name", [""])[0]
+            if not name:
+                self._send(400, {"error": "Pass the filename as ?name="})
+                return
+            self._timed(lambda: self.engine.add_file(name, body))
+            return
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            self._send(400, {"error": "Body must be JSON"})
+            return
+
+        if url.path == "/command":
+            self._timed(lambda: self._command(payload.get("command", "")))
+        elif url.path == "/chat":
+            self._timed(lambda: self.engine.chat(payload.get("query", "")))
+        else:
+            self._send(404, {"error": f"Unknown path {url.path}"})
+
+    def _command(self, command: str) -> dict:
+        if not command.strip():
+            raise ValueError("Missing command")
+        return self.engine.command(command)
+
+    def _timed(self, handler) -> None:
+        """Run a handler and report its duration in a Server-Timing header"""
+        started = time.perf_counter()
+        try:
+            status, payload = 200, handler()
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+        self._send(status, payload, (time.perf_counter() - started) * 1000)
+
+    def _send(self, status: int, payload: dict, duration_ms: float = 0.0) -> None:
+        body = json.dumps(payload, default=str, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Server-Timing", f"app;dur={duration_ms:.1f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve MARK commands and chat over local HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file", action="append", default=[], help="Excel or text file to load for /chat (repeatable)")
+    parser.add_argument("--logs", help="Credentials file; `login for:` and `prefix:` stay empty without it")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    engine = MarkEngine(load_loginbot(args.logs) if args.logs else LoginBot())
+    print("🔥 Warming up MARK...")
+    engine.warm()
+    for path in args.file:
+        with open(path, "rb") as f:
+            engine.add_file(os.path.basename(path), f.read())
+        print(f"📂 Loaded {os.path.basename(path)}")
+
+    MarkRequestHandler.engine = engine
+    server = ThreadingHTTPServer((args.host, args.port), MarkRequestHandler)
+    server.daemon_threads = True
+    server.verbose = args.verbose
+    print(f"📡 MARK listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 MARK server shutting down.")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
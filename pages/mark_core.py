@@ -1,96 +1,618 @@
+import hashlib
 import os
 import pandas as pd
 import sqlite3
-from rapidfuzz import fuzz
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import chain
+from excel_engine import ExcelWorkbook, read_excel_sheet
+from bulk_loader import load_rows, infer_column_types
+from catalog_schema import (build_schema, validate_schema, write_metadata, has_metadata, read_display_names,
+                            read_meta, DATE_COLUMN, SchemaError)
+from search_index import (TrigramIndex, column_texts, join_rows, fuzzy_search, fuzzy_best, build_key_index,
+                          is_text_column, text_row_texts, search_haystack)
+from text_normalize import normalize_text
+from search_config import search_config
+from mark_lookup import disc_rows, DISC_SQL, DISC_LIKE_SQL
+from mark_query import (parse_query, compile_query, quote_identifier, resolve_column, is_date, is_date_range,
+                        date_clause, date_range_clause, ISO_DATE_COLUMN, QueryError)
 
 # Paths relative to the root of your project
 excel_file = "MASTER DVD.xlsx"
 db_file = os.path.join(os.path.dirname(__file__), "..", "mark_database.db")
 
+# Rows per page for paginated filters
+PAGE_SIZE = 50
+
+# Columns that get indexes for filters and find queries
+INDEXED_COLUMNS = ["company", "date", "disc_no"]
+_indexes_checked = False
+
+# Normalized copy of mark_table's text, same rowids, written at refresh for search and count
+SEARCH_TABLE = "mark_search"
+
+# Group-by expressions for `stats:` beyond plain column names
+STATS_GROUPS = {"year": ("Year", f"substr({ISO_DATE_COLUMN}, 1, 4)")}
+# Aggregate results keyed by (database version, group); dropped when the version changes
+_stats_cache = {}
+
+# Seconds between workbook checks by the catalog watcher
+WATCH_INTERVAL = 2.0
+_watcher = None
+_watcher_lock = threading.Lock()
+# One catalog rebuild at a time, whether from the watcher or `refresh`
+_refresh_lock = threading.Lock()
+
+# Display names of the live database, keyed by its file version
+_display_cache = {}
+
+# Search tables keyed by source file and its (mtime, size) so edits invalidate them
+_search_cache = {}
+# Serializes rebuilds so concurrent callers (e.g. mark_server threads) build each table once
+_search_lock = threading.Lock()
+
+# Hits and misses of the in-process caches above, e.g. _cache_counts["search", "hit"]
+_cache_counts = Counter()
+# Database health report for the current file version
+_health_cache = {}
+
 def ensure_db_ready():
+    global _indexes_checked
     if not os.path.exists(db_file):
         refresh_sql_from_excel()
+    elif not _indexes_checked:
+        # Databases built before the schema layer or indexing are upgraded once per process
+        conn = sqlite3.connect(db_file)
+        _upgrade_legacy_table(conn)
+        _add_iso_dates(conn)
+        _add_search_text(conn)
+        _create_indexes(conn)
+        conn.close()
+    _indexes_checked = True
 
-def refresh_sql_from_excel():
-    print("🧠 Booting MARK’s brain from Excel...")
-    df = pd.read_excel(excel_file)
-    conn = sqlite3.connect(db_file)
-    df.to_sql("mark_table", conn, if_exists="replace", index=False)
+def _create_indexes(conn):
+    """Index filter columns both as stored and case-insensitively"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(mark_table)")]
+    for position, column in enumerate(INDEXED_COLUMNS):
+        if column in columns:
+            quoted = quote_identifier(column)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_mark_{position} ON mark_table({quoted})")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_mark_{position}_nocase ON mark_table({quoted} COLLATE NOCASE)")
+    if ISO_DATE_COLUMN in columns:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_mark_{ISO_DATE_COLUMN} ON mark_table({ISO_DATE_COLUMN})")
     conn.commit()
+
+def _upgrade_legacy_table(conn):
+    """Rename sheet-header columns of older databases to canonical names and record their metadata"""
+    if has_metadata(conn):
+        return
+    info = [(row[1], row[2] or "TEXT") for row in conn.execute("PRAGMA table_info(mark_table)") if row[1] != ISO_DATE_COLUMN]
+    if not info:
+        return
+    schema = build_schema([name for name, _ in info], [declared for _, declared in info])
+    for (old_name, declared), column in zip(info, schema):
+        column["type"] = declared
+        if old_name != column["name"]:
+            conn.execute(f"ALTER TABLE mark_table RENAME COLUMN {quote_identifier(old_name)} TO {quote_identifier(column['name'])}")
+    write_metadata(conn, schema, {"upgraded_at": datetime.now().isoformat(timespec="seconds")})
+
+def _add_iso_dates(conn):
+    """Fill a YYYY-MM-DD copy of the date column so ranges and per-year stats are plain indexed comparisons"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(mark_table)")]
+    if DATE_COLUMN not in columns or ISO_DATE_COLUMN in columns:
+        return
+    rows = pd.read_sql_query(f"SELECT rowid AS _rowid, {DATE_COLUMN} FROM mark_table", conn)
+    iso = pd.to_datetime(rows[DATE_COLUMN], errors="coerce").dt.strftime("%Y-%m-%d")
+    conn.execute(f"ALTER TABLE mark_table ADD COLUMN {ISO_DATE_COLUMN} TEXT")
+    conn.executemany(
+        f"UPDATE mark_table SET {ISO_DATE_COLUMN} = ? WHERE rowid = ?",
+        [(value, int(rowid)) for value, rowid in zip(iso.where(iso.notna(), None), rows["_rowid"]) if value]
+    )
+    conn.commit()
+
+def _text_columns(conn, table="mark_table"):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[1] != ISO_DATE_COLUMN]
+
+def _add_search_text(conn):
+    """Store every cell casefolded, accent-stripped and single-spaced so searches never lowercase the data"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [SEARCH_TABLE]).fetchone():
+        return
+    columns = [quote_identifier(col) for col in _text_columns(conn)]
+    if not columns:
+        return
+    conn.create_function("normalize_text", 1, normalize_text, deterministic=True)
+    conn.execute(f"CREATE TABLE {SEARCH_TABLE} ({', '.join(f'{col} TEXT' for col in columns)})")
+    conn.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(columns)}) "
+        f"SELECT rowid, {', '.join(f'normalize_text({col})' for col in columns)} FROM mark_table"
+    )
+    conn.commit()
+
+def db_version():
+    """Counter bumped on every refresh, used to key cached aggregates"""
+    conn = sqlite3.connect(db_file)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    return version
+
+def _display_names(path=None):
+    """Canonical column -> original header, cached until the live database changes"""
+    if path is not None and path != db_file:
+        conn = sqlite3.connect(path)
+        names = read_display_names(conn)
+        conn.close()
+        return names
+    version = _file_version(db_file)
+    if _display_cache.get("version") != version:
+        conn = sqlite3.connect(db_file)
+        _display_cache.update(version=version, names=read_display_names(conn))
+        conn.close()
+    return _display_cache["names"]
+
+def _visible(df, path=None):
+    """Hide helper columns from results and show the workbook's own headers"""
+    return df.drop(columns=ISO_DATE_COLUMN, errors="ignore").rename(columns=_display_names(path))
+
+def refresh_sql_from_excel():
+    with _refresh_lock:
+        print("🧠 Booting MARK’s brain from Excel...")
+        # Rows stream from the workbook straight into SQLite, one chunk in memory at a time
+        workbook = ExcelWorkbook(excel_file)
+        try:
+            headers, chunks = workbook.iter_chunks()
+            first = next(chunks, [])
+            schema = build_schema(headers, infer_column_types(headers, first))
+            # Raises SchemaError before anything is written, so a bad workbook never replaces the catalog
+            for warning in validate_schema(schema, first):
+                print(f"⚠️ {warning}")
+            rows = _publish_database(lambda conn: _write_mark_table(conn, schema, chain([first], chunks)))
+        finally:
+            workbook.close()
+        print(f"✅ Database loaded with {rows} rows via {workbook.engine}. MARK’s memory is sharp.")
+
+def _write_mark_table(conn, schema, chunks):
+    """Bulk-load streamed row chunks into canonical, typed columns and record the schema"""
+    rows = load_rows(conn, "mark_table", [column["name"] for column in schema], chunks,
+                     [column["type"] for column in schema])
+    write_metadata(conn, schema, {
+        "synced_at": datetime.now().isoformat(timespec="seconds"),
+        "source": os.path.basename(excel_file),
+        "source_sha1": _file_sha1(excel_file),
+        "rows": rows,
+    })
+    return rows
+
+def _publish_database(write_table):
+    """
+    Build the catalog in a temporary file next to the live one, then swap it in
+
+    Readers see either the old database or the new one, never a half-loaded
+    table. The in-memory search table holds the whole catalog, so the old
+    one is dropped at the swap and the new one loaded from the published
+    file afterwards; the two are never held together, and the load itself
+    stays chunk-sized. Returns whatever write_table(conn) returns.
+    """
+    version = db_version() if os.path.exists(db_file) else 0
+    handle, building = tempfile.mkstemp(suffix=".db", dir=os.path.dirname(os.path.abspath(db_file)))
+    os.close(handle)
+    try:
+        conn = sqlite3.connect(building)
+        written = write_table(conn)
+        _add_iso_dates(conn)
+        _add_search_text(conn)
+        _create_indexes(conn)
+        conn.execute(f"PRAGMA user_version = {version + 1}")
+        conn.commit()
+        conn.close()
+
+        with _search_lock:
+            os.replace(building, db_file)
+            _search_cache.pop("mark_table", None)
+    finally:
+        if os.path.exists(building):
+            os.remove(building)
+    _load_search_table("mark_table", db_file, _read_mark_table)
+    return written
+
+def _file_version(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _load_search_table(name, path, loader):
+    """Return a source's search table (see _build_search_table), rebuilding only when the file changed"""
+    version = _file_version(path)
+    cached = _search_cache.get(name)
+    if cached is None or cached[0] != version:
+        with _search_lock:
+            cached = _search_cache.get(name)
+            if cached is None or cached[0] != version:
+                _cache_counts["search", "miss"] += 1
+                cached = (version,) + _build_search_table(*loader())
+                _search_cache[name] = cached
+                return cached[1:]
+    _cache_counts["search", "hit"] += 1
+    return cached[1:]
+
+def _build_search_table(df, columns=None):
+    """
+    (df, row texts, trigram index, key index, column texts, text-column row texts)
+
+    columns are the df's normalized column texts when already known.
+    """
+    if columns is None:
+        columns = column_texts(df)
+    texts = join_rows(columns, len(df))
+    text_rows = text_row_texts(columns, [is_text_column(column) for column in columns], len(df))
+    return (df, texts, TrigramIndex(texts), build_key_index(columns), columns, text_rows)
+
+def _fuzzy_rows(table, query, config):
+    """Top (score, row) matches of a search table; `[Column] text` or `column=text` scores one column"""
+    df, texts, index, _, columns, text_rows = table
+    haystack, query_text = search_haystack(query, texts, columns, df.columns, text_rows)
+    if haystack is None:
+        return []
+    return [(score, df.iloc[row_id]) for score, row_id in fuzzy_search(query_text, haystack, index, config)]
+
+def _search_columns_sql(columns):
+    return f"SELECT {', '.join(quote_identifier(col) for col in columns)} FROM {SEARCH_TABLE} ORDER BY rowid"
+
+def _read_mark_table(path=None):
+    """The catalog for display, with the normalized text of its columns read from the search table"""
+    conn = sqlite3.connect(path or db_file)
+    df = pd.read_sql_query("SELECT * FROM mark_table ORDER BY rowid", conn)
+    columns = _text_columns(conn, SEARCH_TABLE)
+    rows = conn.execute(_search_columns_sql(columns)).fetchall()
     conn.close()
-    print("✅ Database loaded. MARK’s memory is sharp.")
+    texts = [[value or "" for value in values] for values in zip(*rows)] if rows else [[] for _ in columns]
+    return _visible(df, path), texts
 
 def search_sql_data(query):
     ensure_db_ready()
-    conn = sqlite3.connect(db_file)
-    df = pd.read_sql_query("SELECT * FROM mark_table", conn)
-    conn.close()
-    results = []
-    for _, row in df.iterrows():
-        text = " ".join(map(str, row.fillna("")))
-        score = fuzz.partial_ratio(query.lower(), text.lower())
-        if score >= 75:
-            results.append((score, row))
-    results.sort(reverse=True, key=lambda x: x[0])
-    return results[:10]
+    return _fuzzy_rows(_load_search_table("mark_table", db_file, _read_mark_table), query, search_config("search"))
+
+def _load_autographs():
+    return _load_search_table("Autographs", excel_file, lambda: (read_excel_sheet(excel_file, "Autographs"),))
 
 def search_autograph_data(query):
     try:
-        df = pd.read_excel(excel_file, sheet_name="Autographs")
+        table = _load_autographs()
     except Exception:
         print("🛑 Couldn't load 'Autographs'. Maybe they're dodging fans.")
         return []
-    results = []
-    for _, row in df.iterrows():
-        row_text = " ".join(map(str, row.fillna("")))
-        score = fuzz.partial_ratio(query.lower(), row_text.lower())
-        if score >= 75:
-            results.append((score, row))
-    results.sort(reverse=True, key=lambda x: x[0])
-    return results[:10]
+    return _fuzzy_rows(table, query, search_config("autograph"))
 
 def get_disc(disc_id):
     ensure_db_ready()
-    conn = sqlite3.connect(db_file)
     try:
-        df = pd.read_sql_query("SELECT * FROM mark_table WHERE [Disc #] = ?", conn, params=[disc_id])
-        if df.empty and disc_id.isdigit():
-            formatted_id = f"DVD{disc_id.zfill(3)}"
-            df = pd.read_sql_query("SELECT * FROM mark_table WHERE [Disc #] = ?", conn, params=[formatted_id])
-        if df.empty:
-            df = pd.read_sql_query("SELECT * FROM mark_table WHERE [Disc #] LIKE ?", conn, params=[f"%{disc_id}%"])
+        return pd.DataFrame(disc_rows(disc_id, db_file))
     except Exception:
-        df = pd.DataFrame()
-    conn.close()
-    return df
+        return pd.DataFrame()
+
+def _count_sql(columns):
+    matches = " + ".join(f"COALESCE(SUM(instr({quote_identifier(col)}, ?) > 0), 0)" for col in columns)
+    return f"SELECT {matches} FROM {SEARCH_TABLE}"
 
 def count_discs(keyword):
+    """Count cells containing the keyword, summed in SQL over the normalized search table"""
     ensure_db_ready()
     conn = sqlite3.connect(db_file)
-    df = pd.read_sql_query("SELECT * FROM mark_table", conn)
+    columns = _text_columns(conn, SEARCH_TABLE)
+    count = conn.execute(_count_sql(columns), [normalize_text(keyword)] * len(columns)).fetchone()[0] if columns else 0
     conn.close()
-    keyword = keyword.lower()
-    count = sum(df[col].astype(str).str.lower().str.contains(keyword).sum() for col in df.columns)
     return count
 
 def first_disc(name_query):
-    matches = search_sql_data(name_query)
-    return matches[0][1] if matches else None
+    ensure_db_ready()
+    df, texts, index, keys, *_ = _load_search_table("mark_table", db_file, _read_mark_table)
+    # An exact cell value beats any fuzzy score; otherwise stop at the first perfect match
+    query = normalize_text(name_query)
+    row_id = keys.get(query)
+    if row_id is None:
+        best = fuzzy_best(query, texts, index, search_config("first_disc"))
+        row_id = best[1] if best else None
+    return df.iloc[row_id] if row_id is not None else None
 
 def filter_by_company(company):
     ensure_db_ready()
     conn = sqlite3.connect(db_file)
-    df = pd.read_sql_query("SELECT * FROM mark_table WHERE Company = ?", conn, params=[company])
+    df = pd.read_sql_query("SELECT * FROM mark_table WHERE company = ?", conn, params=[company])
     conn.close()
-    return df
+    return _visible(df)
+
+def _date_condition(event_date):
+    """
+    WHERE clause for `date:` values on the indexed ISO date column
+
+    A single date, month or year is the range covering it, so `date:2003-01-01`
+    matches the stored 2003-01-01 00:00:00; ranges like 2001..2005 work as
+    written. Anything else is compared with the Date text as given.
+    """
+    event_date = event_date.strip()
+    if is_date(event_date):
+        return date_clause(event_date)
+    if is_date_range(event_date):
+        return date_range_clause(event_date)
+    return f"{DATE_COLUMN} = ?", [event_date]
 
 def filter_by_date(event_date):
+    ensure_db_ready()
+    where, params = _date_condition(event_date)
+    conn = sqlite3.connect(db_file)
+    df = pd.read_sql_query(f"SELECT * FROM mark_table WHERE {where}", conn, params=params)
+    conn.close()
+    return _visible(df)
+
+def _page_sql(where):
+    return f"SELECT rowid AS _rowid, * FROM mark_table WHERE ({where}) AND rowid > ? ORDER BY rowid LIMIT ?"
+
+def fetch_page(where, params, cursor=0, limit=PAGE_SIZE):
+    """
+    Fetch one keyset page of mark_table rows matching a WHERE clause
+
+    Returns (df, next_cursor); next_cursor is None on the last page.
+    """
     ensure_db_ready()
     conn = sqlite3.connect(db_file)
-    df = pd.read_sql_query("SELECT * FROM mark_table WHERE Date = ?", conn, params=[event_date])
+    df = pd.read_sql_query(_page_sql(where), conn, params=list(params) + [cursor or 0, limit + 1])
     conn.close()
+    next_cursor = int(df["_rowid"].iloc[limit - 1]) if len(df) > limit else None
+    return _visible(df.drop(columns="_rowid")).head(limit), next_cursor
+
+def filter_by_company_page(company, cursor=0, limit=PAGE_SIZE):
+    return fetch_page("company = ?", [company], cursor, limit)
+
+def filter_by_date_page(event_date, cursor=0, limit=PAGE_SIZE):
+    where, params = _date_condition(event_date)
+    return fetch_page(where, params, cursor, limit)
+
+def iter_pages(page_fn, value, limit=PAGE_SIZE):
+    """Yield successive non-empty pages from a *_page filter"""
+    cursor = 0
+    while cursor is not None:
+        df, cursor = page_fn(value, cursor, limit)
+        if df.empty:
+            return
+        yield df
+
+def find_discs(query_text):
+    """
+    Run a combined find query, e.g. `company:WWE date>=2003-01-01 "undertaker" limit:20`
+
+    Filters run as one indexed SQL query; free-text terms then rescore the
+    filtered rows with fuzzy matching and add a Score column.
+    Raises QueryError for malformed queries or unknown fields.
+    """
+    ensure_db_ready()
+    parsed = parse_query(query_text)
+    conn = sqlite3.connect(db_file)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(mark_table)")]
+    sql, params = compile_query(parsed, columns)
+    df = pd.read_sql_query(sql, conn, params=params)
+    if parsed["terms"] and not df.empty:
+        # Filtered rows are rescored on their stored search text, not re-normalized here
+        row_text_sql = " || ' ' || ".join(quote_identifier(col) for col in _text_columns(conn, SEARCH_TABLE))
+        texts = dict(conn.execute(
+            f"SELECT rowid, {row_text_sql} FROM {SEARCH_TABLE} WHERE rowid IN (SELECT _rowid FROM ({sql}))", params
+        ))
+        row_text = [texts.get(rowid, "") for rowid in df["_rowid"].tolist()]
+    conn.close()
+    df = _visible(df.drop(columns="_rowid"))
+
+    if parsed["terms"] and not df.empty:
+        config = search_config("find")._replace(limit=parsed["limit"])
+        matches = fuzzy_search(normalize_text(" ".join(parsed["terms"])), row_text, config=config)
+        df = df.iloc[[row_id for _, row_id in matches]].reset_index(drop=True)
+        df.insert(0, "Score", [score for score, _ in matches])
+
     return df
 
+def _stats_sql(expression, label, order):
+    return f"SELECT {expression} AS {quote_identifier(label)}, COUNT(*) AS Count FROM mark_table GROUP BY 1 ORDER BY {order}"
+
+def catalog_stats(group):
+    """
+    Count rows per company, year or any column with one indexed GROUP BY
+
+    Results are cached until the next refresh changes the database version.
+    Raises QueryError for unknown groups.
+    """
+    ensure_db_ready()
+    group = group.strip().lower()
+    conn = sqlite3.connect(db_file)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    cached = _stats_cache.get((version, group))
+    if cached is not None:
+        conn.close()
+        _cache_counts["stats", "hit"] += 1
+        return cached.copy()
+    _cache_counts["stats", "miss"] += 1
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(mark_table)")]
+    try:
+        if group in STATS_GROUPS:
+            label, expression = STATS_GROUPS[group]
+            if ISO_DATE_COLUMN not in columns:
+                raise QueryError("Per-year stats need a refreshed database")
+            order = "1"
+        else:
+            column = resolve_column(group, [col for col in columns if col != ISO_DATE_COLUMN])
+            expression = quote_identifier(column)
+            label = _display_names().get(column, column)
+            order = "Count DESC, 1"
+        df = pd.read_sql_query(_stats_sql(expression, label, order), conn)
+    finally:
+        conn.close()
+
+    for key in [key for key in list(_stats_cache) if key[0] != version]:
+        _stats_cache.pop(key, None)
+    _stats_cache[(version, group)] = df
+    return df.copy()
+
+def _command_queries(columns):
+    """The SQL each command runs, with sample parameters, for EXPLAIN QUERY PLAN"""
+    text_columns = [col for col in columns if col != ISO_DATE_COLUMN]
+    page = [0, PAGE_SIZE + 1]
+    queries = {
+        "disc:ID": (DISC_SQL, ["DVD001"]),
+        "disc:ID (partial)": (DISC_LIKE_SQL, ["%001%"]),
+        "count:keyword": (_count_sql(text_columns), ["keyword"] * len(text_columns)),
+        "search: / first disc:": (_search_columns_sql(text_columns), []),
+    }
+    if "company" in columns:
+        queries["company:NAME"] = (_page_sql("company = ?"), ["WWE"] + page)
+        queries["stats:company"] = (_stats_sql(quote_identifier("company"), "Company", "Count DESC, 1"), [])
+    if ISO_DATE_COLUMN in columns:
+        where, params = _date_condition("2003-01-01")
+        queries["date:DATE"] = (_page_sql(where), params + page)
+        where, params = date_range_clause("2001..2005")
+        queries["date:FROM..TO"] = (_page_sql(where), params + page)
+        queries["stats:year"] = (_stats_sql(STATS_GROUPS["year"][1], "Year", "1"), [])
+        queries["find: date>=DATE"] = compile_query(parse_query("date>=2003-01-01"), columns)
+    return queries
+
+def catalog_health():
+    """
+    Sizes, indexes, sync details and query plans of the live database
+
+    Computed once per database file version; cache hit ratios are read live.
+    """
+    ensure_db_ready()
+    version = _file_version(db_file)
+    if _health_cache.get("version") == version:
+        _cache_counts["health", "hit"] += 1
+        return {**_health_cache["health"], "cache_hit_ratio": cache_hit_ratio()}
+    _cache_counts["health", "miss"] += 1
+
+    conn = sqlite3.connect(db_file)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        try:
+            sizes = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+        except sqlite3.OperationalError:
+            # SQLite built without the dbstat table: sizes are left blank
+            sizes = {}
+        objects = conn.execute(
+            "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE type IN ('table', 'index') ORDER BY tbl_name, type DESC, name"
+        ).fetchall()
+        tables = [
+            {"table": name, "rows": conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(name)}").fetchone()[0],
+             "bytes": sizes.get(name)}
+            for kind, name, _, _ in objects if kind == "table"
+        ]
+        indexes = [
+            {"index": name, "table": table, "bytes": sizes.get(name), "sql": sql or "(automatic)"}
+            for kind, name, table, sql in objects if kind == "index"
+        ]
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(mark_table)")]
+        plans = {}
+        for command, (sql, params) in _command_queries(columns).items():
+            steps = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            plans[command] = {"sql": sql, "plan": [detail for *_, detail in steps]}
+        health = {
+            "version": conn.execute("PRAGMA user_version").fetchone()[0],
+            "file_bytes": page_size * page_count,
+            "meta": read_meta(conn),
+            "tables": tables,
+            "indexes": indexes,
+            "plans": plans,
+        }
+    finally:
+        conn.close()
+
+    _health_cache.update(version=version, health=health)
+    return {**health, "cache_hit_ratio": cache_hit_ratio()}
+
+def cache_hit_ratio():
+    """Hit ratio of each in-process cache so far, None until it has been used"""
+    ratios = {}
+    for cache in sorted({cache for cache, _ in _cache_counts}):
+        hits, misses = _cache_counts[cache, "hit"], _cache_counts[cache, "miss"]
+        ratios[cache] = hits / (hits + misses) if hits + misses else None
+    return ratios
+
+class CatalogWatcher(threading.Thread):
+    """Polls the workbook's mtime and size and rebuilds the catalog in the background when it changes"""
+
+    def __init__(self, interval=WATCH_INTERVAL):
+        super().__init__(name="mark-catalog-watcher", daemon=True)
+        self.interval = interval
+        self.source_version = None
+        # (mtime, size) of a workbook whose rebuild failed, skipped until it changes
+        self.failed_version = None
+        self.last_error = None
+        self._force = False
+        self._wake = threading.Event()
+
+    def request_refresh(self):
+        """Rebuild on the watcher thread as soon as possible, even if the workbook is unchanged"""
+        self._force = True
+        self._wake.set()
+
+    def run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                # Keep serving the last good catalog; check skips this workbook until it changes
+                self.last_error = str(e)
+                print(f"🛑 Catalog reload failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def check(self):
+        if not os.path.exists(excel_file):
+            return
+        current = _file_version(excel_file)
+        force, self._force = self._force, False
+        if current == self.failed_version and not force:
+            return
+
+        if self.source_version is None and not force:
+            # First look: only rebuild if the workbook was saved after the database
+            if os.path.exists(db_file) and current[0] <= os.stat(db_file).st_mtime_ns:
+                self.source_version = current
+                return
+        elif current == self.source_version and not force:
+            return
+
+        # Let a save in progress finish before reading the workbook
+        time.sleep(min(1.0, self.interval))
+        if _file_version(excel_file) != current:
+            return
+
+        try:
+            refresh_sql_from_excel()
+        except Exception:
+            self.failed_version = current
+            raise
+        self.source_version = current
+        self.failed_version = None
+        self.last_error = None
+        try:
+            _load_autographs()
+        except Exception:
+            pass
+
+def start_catalog_watcher(interval=WATCH_INTERVAL):
+    """Start the per-process workbook watcher once and return it"""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = CatalogWatcher(interval)
+            _watcher.start()
+    return _watcher
+
 def roast_unknown_command():
     burns = [
         "If that was a command, it’s in a dialect even I don’t speak.",
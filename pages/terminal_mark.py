@@ -26,13 +26,44 @@ if 'loginbot' not in st.session_state:
     except Exception as e:
         st.write(f"⚠️ Could not load credentials — {e}")
 
-# 📂 Check for database & load if needed
+# 📂 Check for database & load if needed, then pick up workbook edits in the background
 ensure_db_ready()
+catalog_watcher = start_catalog_watcher()
 
 # 📚 Command history
 if 'command_history' not in st.session_state:
     st.session_state.command_history = []
 
+# 📄 Loaded pages of paginated results, keyed by command
+if 'result_pages' not in st.session_state:
+    st.session_state.result_pages = {}
+
+def show_scored_results(results):
+    """Render fuzzy matches as one table instead of one JSON block per row"""
+    st.dataframe(pd.DataFrame([{"Score": score, **row.to_dict()} for score, row in results]), hide_index=True)
+
+def show_paged_results(command, page_fn, value, empty_message):
+    """Render a filter one page at a time, fetching the next page only on request"""
+    state = st.session_state.result_pages.get(command)
+    if state is None:
+        df, cursor = page_fn(value)
+        state = {"pages": [df], "cursor": cursor}
+        st.session_state.result_pages[command] = state
+
+    if state["pages"][0].empty:
+        st.write(empty_message)
+        return
+
+    shown = sum(len(df) for df in state["pages"])
+    st.dataframe(pd.concat(state["pages"], ignore_index=True), hide_index=True)
+    if state["cursor"] is not None:
+        if st.button(f"⬇️ Load {PAGE_SIZE} more ({shown} shown)", key=f"more_{command}"):
+            df, state["cursor"] = page_fn(value, state["cursor"])
+            state["pages"].append(df)
+            st.rerun()
+    else:
+        st.caption(f"{shown} rows")
+
 # 🧭 SIDEBAR
 with st.sidebar:
     st.header("🔐 Credentials")
@@ -47,12 +78,28 @@ with st.sidebar:
 
     st.header("📊 Database Info")
     try:
-        conn = sqlite3.connect(db_file)
-        df = pd.read_sql_query("SELECT COUNT(*) as count FROM mark_table", conn)
-        conn.close()
-        st.write(f"Records in database: {df['count'].iloc[0]}")
+        health = catalog_health()
+        meta = health["meta"]
+        records = next((table["rows"] for table in health["tables"] if table["table"] == "mark_table"), 0)
+        st.write(f"Records in database: {records}")
+        st.write(f"Database size: {health['file_bytes'] / 1024 / 1024:.1f} MB (version {health['version']})")
+        st.write(f"Last sync: {meta.get('synced_at') or meta.get('upgraded_at') or 'unknown'}")
+        if meta.get("source_sha1"):
+            st.caption(f"{meta.get('source', excel_file)} sha1 {meta['source_sha1'][:12]}")
+        ratios = [f"{cache} {ratio:.0%}" for cache, ratio in health["cache_hit_ratio"].items() if ratio is not None]
+        st.write(f"Cache hit ratio: {', '.join(ratios) or 'no lookups yet'}")
+
+        with st.expander("🗂️ Tables and indexes"):
+            st.dataframe(pd.DataFrame(health["tables"]), hide_index=True)
+            st.dataframe(pd.DataFrame(health["indexes"]).drop(columns="sql"), hide_index=True)
+        with st.expander("🔍 Query plans"):
+            for command, query in health["plans"].items():
+                st.write(f"**{command}**")
+                st.code("\n".join(query["plan"]) or "(no plan)", language="text")
     except Exception as e:
         st.error(f"🛑 Database query failed: {e}")
+    if catalog_watcher.last_error:
+        st.warning(f"⚠️ Last reload was rejected, still serving the previous data: {catalog_watcher.last_error}")
 
     st.header("🔐 Login Status")
     if st.session_state.loginbot.loaded:
@@ -65,6 +112,7 @@ st.write("---")
 st.write("**Available Commands:**")
 st.code("""
 search:keyword          - Search for keyword in database
+search:[Column] text    - Search one column only (or search:company=wwe)
 autograph:name          - Search autograph data
 disc:ID                 - Get specific disc by ID (e.g., disc:1 or disc:DVD001)
 count:keyword           - Count occurrences of keyword
@@ -72,8 +120,11 @@ first disc:name         - Get first match for name
 login for:alias         - Get login credentials
 prefix:text             - List aliases starting with text
 company:name            - Filter by company
-date:YYYY-MM-DD         - Filter by date
-refresh                 - Reload database from Excel file
+find <filters> "text"   - Combined query (e.g., find company:WWE date>=2003-01-01 "undertaker" limit:20)
+                          Quote multi-word values: find company:"World Wrestling" date<2001
+date:YYYY-MM-DD         - Filter by day, month or year (ranges too, e.g., date:2001..2005)
+stats:group             - Disc counts per company, year or any column (e.g., stats:year)
+refresh                 - Reload database from Excel file (edits are also picked up automatically)
 exit                    - Close terminal
 """)
 
@@ -93,9 +144,8 @@ if st.button("Execute") or command:
             query = command[7:].strip()
             results = search_sql_data(query)
             if results:
-                for score, row in results:
-                    st.write(f"🔍 **Match ({score}%):**")
-                    st.json(row.to_dict())
+                st.write(f"🔍 **{len(results)} matches:**")
+                show_scored_results(results)
             else:
                 st.write("🫠 Zero matches. Maybe spellcheck is your friend.")
 
@@ -103,9 +153,8 @@ if st.button("Execute") or command:
             query = command[10:].strip()
             results = search_autograph_data(query)
             if results:
-                for score, row in results:
-                    st.write(f"✍️ **Autograph match ({score}%):**")
-                    st.json(row.to_dict())
+                st.write(f"✍️ **{len(results)} autograph matches:**")
+                show_scored_results(results)
             else:
                 st.write("🫠 No autographs found. Maybe they bailed on the signing table.")
 
@@ -152,25 +201,42 @@ if st.button("Execute") or command:
             else:
                 st.write("📡 No aliases found. Try a broader prefix before you start crying.")
 
+        elif command.startswith("find "):
+            try:
+                df = find_discs(command[5:])
+                if not df.empty:
+                    st.write(f"🔎 **{len(df)} rows:**")
+                    st.dataframe(df, hide_index=True)
+                else:
+                    st.write("🫠 Nothing matched all of that. Try loosening a filter.")
+            except QueryError as e:
+                st.write(f"🛑 {e}")
+
         elif command.startswith("company:"):
             company = command[8:].strip()
-            df = filter_by_company(company)
-            if not df.empty:
-                st.dataframe(df)
-            else:
-                st.write(f"🛑 No events found for '{company}'. Even they forgot to show up.")
+            show_paged_results(command, filter_by_company_page, company,
+                               f"🛑 No events found for '{company}'. Even they forgot to show up.")
 
         elif command.startswith("date:"):
             date = command[5:].strip()
-            df = filter_by_date(date)
-            if not df.empty:
-                st.dataframe(df)
-            else:
-                st.write(f"🛑 No events for '{date}'. Maybe it’s a holiday.")
+            try:
+                show_paged_results(command, filter_by_date_page, date,
+                                   f"🛑 No events for '{date}'. Maybe it’s a holiday.")
+            except QueryError as e:
+                st.write(f"🛑 {e}")
+
+        elif command.startswith("stats:"):
+            try:
+                df = catalog_stats(command[6:] or "company")
+                st.write(f"📈 **{len(df)} groups:**")
+                st.dataframe(df, hide_index=True)
+            except QueryError as e:
+                st.write(f"🛑 {e}")
 
         elif command.lower() == "refresh":
-            refresh_sql_from_excel()
-            st.success("📂 Database reloaded from Excel.")
+            catalog_watcher.request_refresh()
+            st.session_state.result_pages = {}
+            st.success("📂 Reloading from Excel in the background. Results switch over when it's done.")
 
         else:
             st.write(roast_unknown_command())
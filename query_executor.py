@@ -0,0 +1,62 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Work for one file (or one sheet of it), returning a list of findings
+PartFunction = Callable[[Dict[str, Any]], List[Any]]
+
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """The process-wide query pool, created on first use so every chat session shares its threads"""
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(
+                max_workers=min(8, (os.cpu_count() or 1) + 4),
+                thread_name_prefix="mark-query"
+            )
+        return _shared_executor
+
+
+def split_sheets(file_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One view of the file per sheet, so every sheet can be scanned as its own task"""
+    if file_data.get('type') != 'excel' or len(file_data.get('sheets', {})) < 2:
+        return [file_data]
+    return [{**file_data, 'sheets': {name: sheet}} for name, sheet in file_data['sheets'].items()]
+
+
+class QueryExecutor:
+    """
+    Fans per-file and per-sheet query work out to a thread pool, merging results in upload order
+
+    Thread-only: the Streamlit and server paths are synchronous, and
+    sheet DataFrames and indexes are shared in memory rather than pickled
+    to worker processes.
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self.executor = executor or shared_executor()
+
+    def map_files(self, fn: PartFunction, uploaded_files: Dict[str, Any]) -> Iterator[Tuple[str, List[Any]]]:
+        """
+        Start fn on every sheet of every file at once
+
+        Tasks are submitted before this returns, so several map_files calls
+        can overlap. The returned iterator yields (filename, findings) in
+        upload order, each file's findings in sheet order, as soon as that
+        file and every file before it are done.
+        """
+        submitted = [
+            (filename, [self.executor.submit(fn, part) for part in split_sheets(file_data)])
+            for filename, file_data in uploaded_files.items()
+        ]
+
+        def results() -> Iterator[Tuple[str, List[Any]]]:
+            for filename, futures in submitted:
+                yield filename, [finding for future in futures for finding in future.result()]
+
+        return results()
@@ -0,0 +1,63 @@
+from typing import Any, Dict
+
+# Rendering caps so broad queries cannot produce multi-megabyte markdown
+MAX_ROWS = 10
+MAX_CELLS = 15
+MAX_CELL_CHARS = 200
+
+
+def truncate(value: Any, max_chars: int = MAX_CELL_CHARS) -> str:
+    """Render a cell value, cutting long values short"""
+    text = str(value)
+    if len(text) > max_chars:
+        return text[:max_chars - 1] + "…"
+    return text
+
+
+class ResponseBuilder:
+    """Accumulates markdown fragments in a list and joins them once"""
+
+    def __init__(self, text: str = ""):
+        self.parts = [text] if text else []
+
+    def add(self, text: str) -> 'ResponseBuilder':
+        """Append raw text"""
+        self.parts.append(text)
+        return self
+
+    def line(self, text: str = "") -> 'ResponseBuilder':
+        """Append text followed by a newline"""
+        self.parts.append(text + "\n")
+        return self
+
+    def fields(self, row: Dict[str, Any], indent: str = "", bold: bool = True,
+               max_cells: int = MAX_CELLS) -> 'ResponseBuilder':
+        """Append one '- key: value' bullet per cell, capped at max_cells"""
+        count = 0
+        for key, value in row.items():
+            if count == max_cells:
+                remaining = len(row) - max_cells
+                self.parts.append(f"{indent}- … {remaining} more fields\n")
+                break
+            label = f"**{key}:**" if bold else f"{key}:"
+            self.parts.append(f"{indent}- {label} {truncate(value)}\n")
+            count += 1
+        return self
+
+    def more(self, remaining: int, noun: str, indent: str = "") -> 'ResponseBuilder':
+        """Append an 'N more' summary when items were left out"""
+        if remaining > 0:
+            self.parts.append(f"{indent}- … {remaining} more {noun}\n")
+        return self
+
+    def build(self) -> str:
+        return "".join(self.parts)
+
+
+def inline_row(row: Dict[str, Any], max_cells: int = MAX_CELLS) -> str:
+    """Compact '{key: value, ...}' rendering of a row with capped cells and values"""
+    items = list(row.items())
+    shown = ", ".join(f"{key}: {truncate(value)}" for key, value in items[:max_cells])
+    if len(items) > max_cells:
+        shown += f", … {len(items) - max_cells} more"
+    return "{" + shown + "}"
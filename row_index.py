@@ -0,0 +1,73 @@
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class RowAddress(NamedTuple):
+    """One sheet (or text file, with sheet None) and where its rows sit in the combined numbering"""
+    filename: str
+    sheet: Optional[str]
+    rows: int
+    start: int
+
+
+class RowAddressIndex:
+    """
+    Row counts of every uploaded sheet and text file, in upload order
+
+    Built from shapes recorded at upload, so answering "row 42 in Sheet2"
+    never touches the data itself; the caller slices the one DataFrame it
+    needs with iloc. Cumulative starts number all rows end to end.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Optional[str], int]] = ()):
+        entries = list(entries)
+        starts = list(accumulate([0] + [rows for _, _, rows in entries]))
+        self.addresses = [
+            RowAddress(filename, sheet, rows, start)
+            for (filename, sheet, rows), start in zip(entries, starts)
+        ]
+        self.total_rows = starts[-1]
+        self._starts = starts[:-1]
+        self._by_name: Dict[str, List[int]] = {}
+        for position, address in enumerate(self.addresses):
+            for name in {address.filename.lower(), (address.sheet or '').lower()} - {''}:
+                self._by_name.setdefault(name, []).append(position)
+
+    @classmethod
+    def for_file(cls, filename: str, file_data: Dict[str, Any]) -> 'RowAddressIndex':
+        if file_data['type'] == 'excel':
+            return cls((filename, sheet_name, sheet_data['shape'][0])
+                       for sheet_name, sheet_data in file_data['sheets'].items())
+        if file_data['type'] == 'text':
+            return cls([(filename, None, file_data['line_count'])])
+        return cls()
+
+    @classmethod
+    def combine(cls, uploaded_files: Dict[str, Any]) -> 'RowAddressIndex':
+        """One index over every file, reusing the per-file indexes built at upload"""
+        entries = []
+        for filename, file_data in uploaded_files.items():
+            index = file_data.get('row_index') or cls.for_file(filename, file_data)
+            entries.extend((filename, address.sheet, address.rows) for address in index.addresses)
+        return cls(entries)
+
+    def find(self, scope: Optional[str] = None) -> List[RowAddress]:
+        """Every sheet, or those whose sheet or file name equals scope (case-insensitive)"""
+        if not scope:
+            return list(self.addresses)
+        return [self.addresses[position] for position in self._by_name.get(scope.strip().lower(), [])]
+
+    def span(self, first: int, last: int) -> List[Tuple[RowAddress, int, int]]:
+        """Sheets covering rows first..last of the combined numbering, each with its own 1-based row range"""
+        first, last = max(first, 1), min(last, self.total_rows)
+        if first > last:
+            return []
+        spans = []
+        position = bisect_right(self._starts, first - 1) - 1
+        while position < len(self.addresses) and self.addresses[position].start < last:
+            address = self.addresses[position]
+            if address.rows:
+                spans.append((address, max(first - address.start, 1), min(last - address.start, address.rows)))
+            position += 1
+        return spans
@@ -0,0 +1,127 @@
+import os
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from rapidfuzz import fuzz, process
+
+# Scorers by name. 'qratio+partial' keeps the best rows by the cheap QRatio,
+# then reranks only those with partial_ratio: faster, at some cost in recall.
+SCORERS = {
+    'partial_ratio': fuzz.partial_ratio,
+    'token_set_ratio': fuzz.token_set_ratio,
+    'WRatio': fuzz.WRatio,
+}
+PREFILTER_SCORER = 'qratio+partial'
+# Rows the QRatio prefilter keeps per result asked for, and at least
+PREFILTER_FACTOR = 20
+PREFILTER_MIN_ROWS = 200
+
+DEFAULT_SCORER = 'partial_ratio'
+DEFAULT_CUTOFF = 75.0
+DEFAULT_LIMIT = 10
+# Commands with their own MARK_SEARCH_<COMMAND>_SCORER / _CUTOFF / _LIMIT settings, and their default limits
+COMMAND_LIMITS = {
+    'search': DEFAULT_LIMIT,
+    'autograph': DEFAULT_LIMIT,
+    'first_disc': 1,
+    'find': DEFAULT_LIMIT,
+    'text': 20,
+    'columns': None,
+}
+
+_configs: Dict[str, 'SearchConfig'] = {}
+
+
+class SearchConfig(NamedTuple):
+    """
+    How fuzzy matches are scored, filtered and capped
+
+    Texts are normalized once at ingest and queries once per request, so
+    scorers run without a processor on every comparison.
+    """
+    scorer: str = DEFAULT_SCORER
+    cutoff: float = DEFAULT_CUTOFF
+    limit: Optional[int] = DEFAULT_LIMIT
+
+    @property
+    def scorer_fn(self):
+        """The scorer applied at the cutoff; partial_ratio reranks for the prefilter scorer"""
+        return fuzz.partial_ratio if self.scorer == PREFILTER_SCORER else SCORERS[self.scorer]
+
+    @property
+    def partial(self) -> bool:
+        """True for the plain partial_ratio scorer, whose matches the trigram index can bound"""
+        return self.scorer == 'partial_ratio'
+
+    def score(self, query: str, text: str) -> float:
+        return self.scorer_fn(query, text)
+
+    def extract(self, query: str, choices: Sequence[str]) -> List[Tuple[float, int]]:
+        """
+        (score, position) of every choice at or above the cutoff
+
+        Sorted by score, ties in choice order. The limit is left to the
+        caller, except that the prefilter only reranks its best rows.
+        """
+        positions = None
+        if self.scorer == PREFILTER_SCORER:
+            keep = max(PREFILTER_MIN_ROWS, PREFILTER_FACTOR * (self.limit or 0))
+            if len(choices) > keep:
+                positions = [position for _, _, position in process.extract(query, choices, scorer=fuzz.QRatio, limit=keep)]
+                choices = [choices[position] for position in positions]
+
+        matches = process.extract(query, choices, scorer=self.scorer_fn, score_cutoff=self.cutoff, limit=None)
+        scored = [(score, positions[position] if positions is not None else position) for _, score, position in matches]
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return scored
+
+    def best(self, query: str, choices: Sequence[str]) -> Optional[Tuple[float, int]]:
+        """
+        Best (score, position) at or above the cutoff, or None
+
+        extractOne stops at the first perfect score, so a hit near the top
+        ends the scan early.
+        """
+        if self.scorer == PREFILTER_SCORER:
+            matches = self.extract(query, choices)
+            return matches[0] if matches else None
+        match = process.extractOne(query, choices, scorer=self.scorer_fn, score_cutoff=self.cutoff)
+        return (match[1], match[2]) if match else None
+
+
+def _setting(environ: Mapping[str, str], command: str, name: str) -> Optional[str]:
+    return environ.get(f"MARK_SEARCH_{command.upper()}_{name}", environ.get(f"MARK_SEARCH_{name}"))
+
+
+def load_search_config(command: str = 'search', environ: Mapping[str, str] = os.environ) -> SearchConfig:
+    """
+    Read a command's configuration from the environment
+
+    MARK_SEARCH_SCORER, MARK_SEARCH_CUTOFF and MARK_SEARCH_LIMIT apply to
+    every command; MARK_SEARCH_<COMMAND>_* (e.g. MARK_SEARCH_AUTOGRAPH_CUTOFF)
+    override them for one. A limit of 0 or `none` means no limit.
+
+    Raises:
+        ValueError: for unknown commands, scorers or malformed numbers
+    """
+    if command not in COMMAND_LIMITS:
+        raise ValueError(f"Unknown search command '{command}'. Use one of: {', '.join(COMMAND_LIMITS)}")
+
+    scorer = _setting(environ, command, 'SCORER') or DEFAULT_SCORER
+    if scorer not in SCORERS and scorer != PREFILTER_SCORER:
+        raise ValueError(f"Unknown scorer '{scorer}'. Use one of: {', '.join([*SCORERS, PREFILTER_SCORER])}")
+
+    cutoff = _setting(environ, command, 'CUTOFF')
+    limit = _setting(environ, command, 'LIMIT')
+    if limit is None:
+        limit = COMMAND_LIMITS[command]
+    elif limit.strip().lower() in ('0', 'none'):
+        limit = None
+    else:
+        limit = int(limit)
+    return SearchConfig(scorer, float(cutoff) if cutoff is not None else DEFAULT_CUTOFF, limit)
+
+
+def search_config(command: str = 'search') -> SearchConfig:
+    """A command's configuration, read from the environment once per process"""
+    if command not in _configs:
+        _configs[command] = load_search_config(command)
+    return _configs[command]
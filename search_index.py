@@ -0,0 +1,246 @@
+import re
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+from search_config import SearchConfig, search_config
+from text_normalize import normalize_text
+from catalog_schema import canonical_name
+
+# Non-blank cells sampled per column when deciding whether it holds text
+TEXT_SAMPLE_SIZE = 1000
+# Share of sampled cells that must contain a letter
+TEXT_MIN_ALPHA_RATIO = 0.5
+# Share of sampled cells shaped like an ID (dvd001, ab-1234) above which a column is not text
+TEXT_MAX_ID_RATIO = 0.9
+ID_PATTERN = re.compile(r'[a-z]{0,4}[-_ #]?\d[\w-]*')
+LETTER_PATTERN = re.compile(r'[^\W\d_]')
+
+# `[Company] wwe` or `title=matrix`: search one column only
+BRACKET_QUERY_PATTERN = re.compile(r'\s*\[([^\]]+)\]\s*(.*)', re.DOTALL)
+FIELD_QUERY_PATTERN = re.compile(r'\s*([^=\[\]]+?)\s*=\s*(.+)', re.DOTALL)
+
+
+def column_texts(df: pd.DataFrame) -> List[List[str]]:
+    """Normalized text of every cell, one list per column, blanks for missing cells"""
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Each category is normalized once rather than once per row
+            categories = [normalize_text(value) for value in series.cat.categories]
+            columns.append(['' if code < 0 else categories[code] for code in series.cat.codes.tolist()])
+        else:
+            columns.append(['' if pd.isna(value) else normalize_text(value) for value in series.tolist()])
+    return columns
+
+
+def join_rows(columns: List[List[str]], size: int = 0) -> List[str]:
+    """'value value value' search text for every row of column_texts output"""
+    if not columns:
+        return [''] * size
+    return [' '.join(values) for values in zip(*columns)]
+
+
+def row_texts(df: pd.DataFrame) -> List[str]:
+    """Normalized 'value value value' text for every row, blanks for missing cells"""
+    return join_rows(column_texts(df), len(df))
+
+
+def build_key_index(columns: List[List[str]]) -> Dict[str, int]:
+    """Map every normalized cell value to the first row containing it"""
+    keys: Dict[str, int] = {}
+    for texts in columns:
+        for row_id, key in enumerate(texts):
+            if key and keys.get(key, row_id) >= row_id:
+                keys[key] = row_id
+    return keys
+
+
+def is_text_column(texts: List[str]) -> bool:
+    """
+    True for columns of words worth fuzzy matching
+
+    Numbers, dates and ID codes are left out so a query is not scored
+    against digits that happen to share characters with it.
+    """
+    step = max(1, len(texts) // TEXT_SAMPLE_SIZE)
+    sample = [text for text in texts[::step] if text][:TEXT_SAMPLE_SIZE]
+    if not sample:
+        return False
+    if sum(1 for text in sample if LETTER_PATTERN.search(text)) < TEXT_MIN_ALPHA_RATIO * len(sample):
+        return False
+    return sum(1 for text in sample if ID_PATTERN.fullmatch(text)) <= TEXT_MAX_ID_RATIO * len(sample)
+
+
+def text_row_texts(columns: List[List[str]], text_columns: List[bool], size: int = 0) -> Optional[List[str]]:
+    """Row texts of the text columns alone, or None when they would equal the full row texts or be empty"""
+    picked = [texts for texts, is_text in zip(columns, text_columns) if is_text]
+    if not picked or len(picked) == len(columns):
+        return None
+    return join_rows(picked, size)
+
+
+def split_column_query(query: str) -> Tuple[Optional[str], str]:
+    """`[Company] wwe` and `company=wwe` -> ('Company' or 'company', 'wwe'); anything else -> (None, query)"""
+    for pattern in (BRACKET_QUERY_PATTERN, FIELD_QUERY_PATTERN):
+        match = pattern.fullmatch(query)
+        if match:
+            return match.group(1).strip(), match.group(2).strip()
+    return None, query
+
+
+def find_column(name: str, column_names: Sequence) -> Optional[int]:
+    """Position of the column a query names, by header text or its canonical form (`Disc #` = disc_no)"""
+    wanted = normalize_text(name)
+    keys = [normalize_text(column) for column in column_names]
+    if wanted in keys:
+        return keys.index(wanted)
+    wanted = canonical_name(name)
+    canonical = [canonical_name(column) for column in column_names]
+    return canonical.index(wanted) if wanted in canonical else None
+
+
+def search_haystack(query: str, row_texts: List[str], columns: List[List[str]], column_names: Sequence,
+                    text_rows: Optional[List[str]] = None) -> Tuple[Optional[List[str]], str]:
+    """
+    Pick the per-row texts a search query is scored against
+
+    A named column narrows scoring to that column; its name is dropped from
+    the query. Otherwise queries without digits are scored on the text
+    columns only, and queries with digits (IDs, years) on whole rows.
+
+    Returns:
+        (texts aligned with the rows, normalized query); texts is None when
+        the named column does not exist
+    """
+    column, text = split_column_query(query)
+    if column is not None:
+        position = find_column(column, column_names)
+        return (columns[position] if position is not None else None), normalize_text(text)
+    text = normalize_text(text)
+    if text_rows is None or any(char.isdigit() for char in text):
+        return row_texts, text
+    return text_rows, text
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def max_lost_trigrams(length: int, cutoff: float) -> int:
+    """
+    Most trigrams of a query of this length that a partial_ratio match at or above cutoff can break
+
+    partial_ratio aligns the query with a window of at most its own length,
+    scoring 2M / (length + window) for M matched characters. With D query
+    characters deleted and I inserted (I <= D), that score is at least
+    cutoff while (2 - c)D + cI <= 2 * length * (1 - c). A deletion breaks
+    at most 3 trigrams and an insertion 2, so the worst case is found by
+    trying every D.
+    """
+    c = cutoff / 100
+    if c <= 0:
+        return length
+    budget = 2 * length * (1 - c) + 1e-9
+    lost = 0
+    for deleted in range(length + 1):
+        left = budget - (2 - c) * deleted
+        if left < 0:
+            break
+        lost = max(lost, 3 * deleted + 2 * min(deleted, int(left / c)))
+    return lost
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to the ids of rows containing them
+
+    Postings are built on the first query whose cutoff lets the bound prune,
+    so sources only searched at lower cutoffs (like the default 75) never
+    pay for them.
+    """
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.size = len(texts)
+        self.lengths: Optional[np.ndarray] = None
+        self.postings: Optional[Dict[str, np.ndarray]] = None
+        self._lock = threading.Lock()
+
+    def build(self) -> 'TrigramIndex':
+        """Build the row lengths and postings if no query has yet; safe to call from several threads"""
+        with self._lock:
+            if self.postings is None:
+                self.lengths = np.fromiter(map(len, self.texts), dtype=np.int32, count=self.size)
+                postings: Dict[str, List[int]] = {}
+                for row_id, text in enumerate(self.texts):
+                    for trigram in _trigrams(text):
+                        postings.setdefault(trigram, []).append(row_id)
+                self.postings = {trigram: np.array(ids, dtype=np.int32) for trigram, ids in postings.items()}
+        return self
+
+    def candidates(self, query: str, cutoff: float) -> Optional[np.ndarray]:
+        """
+        Return ids of every row that can score at least cutoff with partial_ratio
+
+        A row must share all but max_lost_trigrams of the query's trigrams.
+        Rows no longer than the query are always kept, since partial_ratio
+        may then align the row inside the query instead. Returns None when the bound
+        prunes nothing, in which case the caller should scan every row.
+        """
+        query_trigrams = _trigrams(query)
+        needed = len(query_trigrams) - max_lost_trigrams(len(query), cutoff)
+        if needed <= 0:
+            return None
+
+        self.build()
+        shared = np.zeros(self.size, dtype=np.int32)
+        for trigram in query_trigrams:
+            if trigram in self.postings:
+                shared[self.postings[trigram]] += 1
+        return np.flatnonzero((shared >= needed) | (self.lengths <= len(query)))
+
+
+def _candidates(query: str, texts: List[str], index: Optional[TrigramIndex],
+                config: SearchConfig) -> Optional[np.ndarray]:
+    """Trigram candidates when the index was built on these texts and bounds the scorer, else None"""
+    if index is None or index.texts is not texts or not config.partial:
+        return None
+    return index.candidates(query, config.cutoff)
+
+
+def fuzzy_search(query: str, texts: List[str], index: Optional[TrigramIndex] = None,
+                 config: Optional[SearchConfig] = None) -> List[Tuple[float, int]]:
+    """
+    Score rows against a normalized query with the configured scorer
+
+    When the index was built on these texts and the scorer is partial_ratio,
+    only rows the trigram bound cannot rule out are scored.
+
+    Returns:
+        Up to config.limit (score, row id) pairs sorted by score, ties kept in row order
+    """
+    config = config or search_config()
+    candidate_ids = _candidates(query, texts, index, config)
+
+    if candidate_ids is None:
+        scored = config.extract(query, texts)
+    else:
+        scored = [(score, int(candidate_ids[position]))
+                  for score, position in config.extract(query, [texts[row_id] for row_id in candidate_ids])]
+
+    return scored[:config.limit] if config.limit is not None else scored
+
+
+def fuzzy_best(query: str, texts: List[str], index: Optional[TrigramIndex] = None,
+               config: Optional[SearchConfig] = None) -> Optional[Tuple[float, int]]:
+    """Return the best (score, row id) for a normalized query, or None"""
+    config = config or search_config('first_disc')
+    candidate_ids = _candidates(query, texts, index, config)
+
+    if candidate_ids is None:
+        return config.best(query, texts)
+
+    match = config.best(query, [texts[row_id] for row_id in candidate_ids])
+    return (match[0], int(candidate_ids[match[1]])) if match else None
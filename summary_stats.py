@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+
+# Sheets up to this many rows are summarized exactly with describe()
+EXACT_MAX_ROWS = 200_000
+# Rows kept by the reservoir when quantiles are estimated
+SAMPLE_SIZE = 10_000
+# Rows per chunk of the streaming pass over larger sheets
+CHUNK_ROWS = 100_000
+
+
+class RunningMoments:
+    """Count, mean, variance, min and max of a column, merged chunk by chunk"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold in one chunk of floats; NaNs are skipped"""
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        count = len(values)
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        total = self.count + count
+        delta = mean - self.mean
+        # Chan et al.'s pairwise update keeps the variance stable across chunks
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+
+class Reservoir:
+    """Uniform sample of fixed size from a stream of unknown length (Algorithm R)"""
+
+    def __init__(self, size: int = SAMPLE_SIZE, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self.items = np.empty(0, dtype=np.int64)
+        self._rng = np.random.default_rng(seed)
+
+    def extend(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.int64)
+        fill = min(self.size - len(self.items), len(values))
+        if fill > 0:
+            self.items = np.concatenate([self.items, values[:fill]])
+        rest = values[max(fill, 0):]
+        if len(rest):
+            # Item number t replaces a random slot with probability size / (t + 1)
+            positions = self.seen + max(fill, 0) + np.arange(len(rest))
+            slots = self._rng.integers(0, positions + 1)
+            keep = slots < self.size
+            self.items[slots[keep]] = rest[keep]
+        self.seen += len(values)
+
+
+def summarize_dataframe(df: pd.DataFrame, exact_max_rows: int = EXACT_MAX_ROWS,
+                        sample_size: int = SAMPLE_SIZE) -> Dict[str, Any]:
+    """
+    Row and column counts, nulls, dtypes and a numeric describe() of a sheet
+
+    Above exact_max_rows one streaming pass computes nulls, count, mean,
+    std, min and max, while quartiles come from a reservoir sample of rows.
+    Such summaries have 'approximate' set and report their 'sample_size'.
+    """
+    summary = {
+        'row_count': len(df),
+        'column_count': len(df.columns),
+        'data_types': df.dtypes.astype(str).to_dict(),
+        'approximate': len(df) > exact_max_rows,
+    }
+    numeric_cols = df.select_dtypes(include=['number']).columns
+
+    if not summary['approximate']:
+        summary['null_values'] = df.isnull().sum().to_dict()
+        if len(numeric_cols) > 0:
+            summary['numeric_summary'] = df[numeric_cols].describe().to_dict()
+        return summary
+
+    nulls = pd.Series(0, index=df.columns)
+    moments = {col: RunningMoments() for col in numeric_cols}
+    reservoir = Reservoir(sample_size)
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS]
+        nulls += chunk.isnull().sum()
+        for col in numeric_cols:
+            moments[col].update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+        reservoir.extend(np.arange(start, start + len(chunk)))
+
+    summary['null_values'] = nulls.to_dict()
+    summary['sample_size'] = len(reservoir.items)
+    if len(numeric_cols) > 0:
+        sample = df[numeric_cols].iloc[np.sort(reservoir.items)]
+        quartiles = sample.quantile([0.25, 0.5, 0.75])
+        summary['numeric_summary'] = {
+            col: {
+                'count': float(moments[col].count),
+                'mean': float(moments[col].mean) if moments[col].count else np.nan,
+                'std': moments[col].std,
+                'min': float(moments[col].min),
+                '25%': float(quartiles.at[0.25, col]),
+                '50%': float(quartiles.at[0.5, col]),
+                '75%': float(quartiles.at[0.75, col]),
+                'max': float(moments[col].max),
+            }
+            for col in numeric_cols
+        }
+    return summary
+
+
+def format_number(value: Optional[float]) -> str:
+    """Short display form of a summary statistic"""
+    if value is None or pd.isna(value):
+        return 'n/a'
+    return f"{value:,.0f}" if abs(value) >= 1000 else f"{value:,.4g}"
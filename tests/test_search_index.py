@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from search_config import SearchConfig
+from search_index import TrigramIndex, fuzzy_best, fuzzy_search
+
+WORDS = ['matrix', 'wrestling', 'classic', 'raw', 'nitro', 'house', 'show', 'tour', 'special',
+         'tribute', 'legends', 'road', 'warriors', 'ladder', 'match', 'title', 'undertaker', 'wwe']
+
+
+def _catalog(rows=200, seed=0):
+    rng = random.Random(seed)
+    return [f"dvd{row:04d} {' '.join(rng.choices(WORDS, k=3))} {rng.randint(1985, 2020)}" for row in range(rows)]
+
+
+def _typo(text, rng, edits):
+    chars = list(text)
+    for _ in range(edits):
+        position = rng.randrange(len(chars))
+        edit = rng.choice(('swap', 'drop', 'insert', 'replace'))
+        if edit == 'swap' and position + 1 < len(chars):
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+        elif edit == 'drop' and len(chars) > 1:
+            del chars[position]
+        elif edit == 'insert':
+            chars.insert(position, rng.choice('abcdefghijklmnopqrstuvwxyz'))
+        else:
+            chars[position] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+    return ''.join(chars)
+
+
+def _queries(texts, count=150, seed=1):
+    rng = random.Random(seed)
+    queries = ['mtarix', 'undertakr', 'ladder match', 'wrestlign classic']
+    for _ in range(count):
+        text = rng.choice(texts)
+        start = rng.randrange(len(text) - 3)
+        queries.append(_typo(text[start:start + rng.randint(4, 20)], rng, rng.randint(0, 3)))
+    return queries
+
+
+@pytest.mark.parametrize('cutoff', [60, 75, 85, 90, 95])
+def test_index_matches_full_scan(cutoff):
+    texts = _catalog()
+    index = TrigramIndex(texts)
+    config = SearchConfig('partial_ratio', cutoff, None)
+    for query in _queries(texts):
+        assert fuzzy_search(query, texts, index, config) == fuzzy_search(query, texts, None, config), query
+
+
+@pytest.mark.parametrize('cutoff', [75, 90])
+def test_index_best_matches_full_scan(cutoff):
+    texts = _catalog()
+    index = TrigramIndex(texts)
+    config = SearchConfig('partial_ratio', cutoff, 1)
+    for query in _queries(texts, count=50):
+        with_index, full_scan = fuzzy_best(query, texts, index, config), fuzzy_best(query, texts, None, config)
+        assert (with_index and with_index[0]) == (full_scan and full_scan[0]), query
+
+
+def test_typo_still_matches():
+    texts = _catalog()
+    matches = fuzzy_search('mtarix', texts, TrigramIndex(texts), SearchConfig('partial_ratio', 75, 10))
+    assert len(matches) == 10
+    assert all(score >= 75 for score, _ in matches)
+
+
+def test_index_ignored_for_other_texts():
+    texts = _catalog()
+    index = TrigramIndex(texts)
+    other = [text.upper() for text in texts]
+    config = SearchConfig('partial_ratio', 90, None)
+    assert fuzzy_search('DVD0042', other, index, config) == fuzzy_search('DVD0042', other, None, config)
+
+
+def test_postings_built_only_when_the_cutoff_prunes():
+    texts = _catalog()
+    index = TrigramIndex(texts)
+    fuzzy_search('undertaker', texts, index, SearchConfig('partial_ratio', 75, None))
+    fuzzy_search('undertaker', texts, index, SearchConfig('WRatio', 95, None))
+    assert index.postings is None
+    fuzzy_search('undertaker', texts, index, SearchConfig('partial_ratio', 95, None))
+    assert index.postings is not None
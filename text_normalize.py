@@ -0,0 +1,37 @@
+import unicodedata
+from typing import Any
+
+# Letters that carry no combining mark under NFKD but still have a plain spelling
+PLAIN_LETTERS = str.maketrans({
+    'æ': 'ae',
+    'œ': 'oe',
+    'ø': 'o',
+    'đ': 'd',
+    'ð': 'd',
+    'ł': 'l',
+    'ı': 'i',
+    'þ': 'th',
+})
+
+
+def strip_accents(text: str) -> str:
+    """Drop diacritics: `Beyoncé` -> `Beyonce`, `Łódź` -> `Lodz` once casefolded"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_text(value: Any) -> str:
+    """
+    Search form of a cell value, text line or query
+
+    Casefolded, accent-stripped and whitespace-collapsed, so `  Café  del MAR`
+    and `cafe del mar` compare equal. Missing values become ''. Data is
+    normalized once at ingest and queries once per request, so the same
+    function must be used on both sides.
+    """
+    if value is None:
+        return ''
+    text = value if isinstance(value, str) else str(value)
+    if text.isascii():
+        return ' '.join(text.lower().split())
+    return ' '.join(strip_accents(text.casefold()).translate(PLAIN_LETTERS).split())
@@ -0,0 +1,57 @@
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, Tuple
+
+# Words are runs of letters, digits and underscores
+TOKEN_PATTERN = re.compile(r'\w+')
+# Any whitespace character, where a chunk may end
+WHITESPACE = re.compile(r'\s')
+# Characters handed to the regex at a time, so huge texts are never copied whole
+CHUNK_CHARS = 1 << 20
+# Shortest word counted by the text summary's top words
+TOP_WORD_MIN_LENGTH = 4
+
+_patterns: Dict[int, re.Pattern] = {1: TOKEN_PATTERN}
+
+
+def _pattern(min_length: int) -> re.Pattern:
+    """Token pattern that only matches words of at least min_length characters"""
+    if min_length not in _patterns:
+        _patterns[min_length] = re.compile(rf'\w{{{min_length},}}')
+    return _patterns[min_length]
+
+
+def iter_text_chunks(text: str, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    """Slices of at least chunk_chars characters, each running on to the next whitespace so no word is cut in two"""
+    start = 0
+    while start < len(text):
+        end = start + chunk_chars
+        if end < len(text):
+            cut = WHITESPACE.search(text, end)
+            end = cut.end() if cut else len(text)
+        yield text[start:end]
+        start = end
+
+
+def count_tokens(text: str, min_length: int = 1) -> Counter:
+    """Frequency of every lowercased word of at least min_length characters"""
+    pattern = _pattern(min_length)
+    counts = Counter()
+    for chunk in iter_text_chunks(text):
+        counts.update(pattern.findall(chunk.lower()))
+    return counts
+
+
+def top_tokens(text: str, n: int = 10, min_length: int = TOP_WORD_MIN_LENGTH) -> List[Tuple[str, int]]:
+    """The n most frequent words, ties in first-seen order"""
+    return count_tokens(text, min_length).most_common(n)
+
+
+def word_stats(text: str) -> Tuple[int, int]:
+    """(number of whitespace-separated words, total characters in them)"""
+    words = characters = 0
+    for chunk in iter_text_chunks(text):
+        chunk_words = chunk.split()
+        words += len(chunk_words)
+        characters += sum(map(len, chunk_words))
+    return words, characters